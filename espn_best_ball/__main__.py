@@ -0,0 +1,5 @@
+"""Run the espn-best-ball command line tool with ``python -m espn_best_ball``."""
+
+from .cli import main
+
+raise SystemExit(main())
@@ -0,0 +1 @@
+"""espn_best_ball.benchmarks.__init__."""
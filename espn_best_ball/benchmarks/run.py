@@ -0,0 +1,133 @@
+"""Run the benchmark suite and track results over time."""
+
+import argparse
+import inspect
+import json
+import subprocess
+import time
+import timeit
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from . import suite
+from .synthetic import SCALES, Scale
+
+DEFAULT_HISTORY = Path("benchmark_history.jsonl")
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 1.25
+
+
+def run_benchmarks(
+    scale: Scale, repeat: int = DEFAULT_REPEAT, pattern: str = ""
+) -> Dict[str, Optional[float]]:
+    """Time every benchmark whose name contains pattern.
+
+    Each benchmark is the best of ``repeat`` runs, in seconds, and None when its
+    class was skipped. A class's ``teardown``, if any, runs after its benchmarks.
+    """
+    results = {}
+    for class_name, benchmark_class in inspect.getmembers(suite, inspect.isclass):
+        if benchmark_class.__module__ != suite.__name__:
+            continue
+
+        names = [
+            f"{class_name}.{name}"
+            for name in dir(benchmark_class)
+            if name.startswith("time_") and pattern in f"{class_name}.{name}"
+        ]
+        if not names:
+            continue
+
+        benchmarks = benchmark_class()
+        try:
+            benchmarks.setup(scale)
+        except suite.SkipBenchmark:
+            results.update({name: None for name in names})
+            continue
+
+        try:
+            for name in names:
+                method = getattr(benchmarks, name.split(".")[1])
+                results[name] = min(timeit.repeat(method, number=1, repeat=repeat))
+        finally:
+            if hasattr(benchmarks, "teardown"):
+                benchmarks.teardown(scale)
+
+    return results
+
+
+def find_regressions(
+    results: Dict[str, Optional[float]],
+    previous: Dict[str, Optional[float]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> List[str]:
+    """Return the benchmarks that got slower than threshold times previous."""
+    return [
+        name
+        for name, seconds in results.items()
+        if seconds is not None
+        and previous.get(name)
+        and seconds > previous[name] * threshold
+    ]
+
+
+def load_history(path: Path) -> List[Dict]:
+    """Load every recorded run."""
+    if not path.exists():
+        return []
+
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _git_commit() -> Optional[str]:
+    """Return the current git commit, if there is one."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the benchmarks, append them to the history and flag regressions."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--pattern", default="", help="only run matching benchmarks")
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(SCALES[args.scale], args.repeat, args.pattern)
+    previous_runs = [
+        run for run in load_history(args.history) if run["scale"] == args.scale
+    ]
+    previous = previous_runs[-1]["results"] if previous_runs else {}
+    regressions = find_regressions(results, previous, args.threshold)
+
+    for name, seconds in results.items():
+        timing = "skipped" if seconds is None else f"{seconds * 1000:10.2f} ms"
+        before = previous.get(name)
+        change = f" ({seconds / before:.2f}x)" if seconds and before else ""
+        flag = " REGRESSION" if name in regressions else ""
+        print(f"{name:<50} {timing}{change}{flag}")
+
+    with open(args.history, "a") as f:
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "scale": args.scale,
+            "results": results,
+        }
+        f.write(json.dumps(record) + "\n")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,323 @@
+"""Benchmarks of the scoring, validation and ranking hot paths.
+
+Classes follow the asv layout: ``setup`` builds synthetic data for a Scale,
+every ``time_*`` method is one timed benchmark and ``teardown`` cleans up. ``setup``
+raises SkipBenchmark to skip a class when an optional dependency is missing.
+"""
+
+import importlib
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from ..draft.retrospective import WeekPoints, draft_retrospective
+from ..draft.validate_draft_order import (
+    compare_rankings,
+    load_csv_draft_order,
+    load_html_draft_order,
+)
+from ..league.batch_lineup import best_ball_lineups, pack_rosters
+from ..league.fetch import WeekData
+from ..league.free_agent_pool import FreeAgentPool, replace_rows_with_free_agent
+from ..league.player_store import create_ideal_lineup_rows, ideal_lineup_rows
+from ..league.rough_best_ball_score import (
+    _team_lineups,
+    get_best_ball_scores,
+    pack_week_data,
+)
+from ..my_order.depth_charts import iter_depth_chart_records
+from ..my_order.ranking_engine import rank_submissions
+from ..player_index import PlayerIndex
+from .synthetic import (
+    Scale,
+    SyntheticLeague,
+    synthetic_draft_ranking,
+    synthetic_html_board,
+    synthetic_ranking_data,
+)
+
+RANKING_WEIGHTS = 64
+SUBCOMMAND_IMPORTS = {
+    "score": [
+        "espn_best_ball.league.response_cache",
+        "espn_best_ball.league.results_store",
+        "espn_best_ball.league.rough_best_ball_score",
+    ],
+    "rank": ["espn_best_ball.my_order.create_ranking"],
+    "validate": ["espn_best_ball.draft.batch_validate"],
+    "fetch_adp": ["espn_best_ball.my_order.adp_warehouse"],
+}
+POSITION_LIMITS = {"RB": 5, "WR": 5, "QB": 2, "TE": 2}
+
+
+class SkipBenchmark(Exception):
+    """A benchmark class cannot run here, e.g. without an optional dependency."""
+
+
+def _week_lineups(league: SyntheticLeague):
+    """Return every team's lineup for every week, with each week's free agents."""
+    return [
+        (
+            list(_team_lineups(league.box_scores(week)).values()),
+            league.free_agents(week),
+        )
+        for week in range(1, league.current_week)
+    ]
+
+
+def _league_store(league: SyntheticLeague):
+    """Pack every week of a league into a player week store."""
+    return pack_week_data(
+        league.teams,
+        [
+            WeekData(week, league.box_scores(week), league.free_agents(week))
+            for week in range(1, league.current_week)
+        ],
+    )
+
+
+class Lineups:
+    """Pick best ball lineups."""
+
+    def setup(self, scale: Scale):
+        """Create every lineup in a league."""
+        weeks = _week_lineups(SyntheticLeague(scale.teams, scale.weeks))
+        self.points, self.eligible = pack_rosters(
+            [[lineups[team] for lineups, _ in weeks] for team in range(scale.teams)]
+        )
+
+    def time_best_ball_lineups(self):
+        """Pick every lineup at once."""
+        best_ball_lineups(self.points, self.eligible)
+
+
+class FreeAgents:
+    """Stream free agents into zero point slots, as scoring does."""
+
+    def setup(self, scale: Scale):
+        """Pack a league into a store and pick every ideal lineup."""
+        self.store = _league_store(SyntheticLeague(scale.teams, scale.weeks))
+        self.weeks, self.lineup_rows = ideal_lineup_rows(self.store)
+
+    def time_free_agent_pool(self):
+        """Pool each week's free agents and claim them for every lineup."""
+        for week_index, week in enumerate(self.weeks):
+            pool = FreeAgentPool(self.store, week)
+            for rows in self.lineup_rows[:, week_index]:
+                replace_rows_with_free_agent(self.store, rows, pool)
+
+
+class PlayerStore:
+    """Pick lineups and stream free agents from the player week store."""
+
+    def setup(self, scale: Scale):
+        """Pack a league into a store."""
+        league = SyntheticLeague(scale.teams, scale.weeks)
+        self.store = _league_store(league)
+        self.team_weeks = [
+            (week, self.store.rows(week, team))
+            for week in range(1, league.current_week)
+            for team in range(scale.teams)
+        ]
+
+    def time_create_ideal_lineup_rows(self):
+        """Pick each lineup one at a time."""
+        for _, rows in self.team_weeks:
+            create_ideal_lineup_rows(self.store, rows)
+
+    def time_ideal_lineup_rows(self):
+        """Pick every lineup at once."""
+        ideal_lineup_rows(self.store)
+
+    def time_replace_rows_with_free_agent(self):
+        """Pick and stream each lineup one at a time."""
+        pools = {}
+        for week, rows in self.team_weeks:
+            if week not in pools:
+                pools[week] = FreeAgentPool(self.store, week)
+            replace_rows_with_free_agent(
+                self.store, create_ideal_lineup_rows(self.store, rows), pools[week]
+            )
+
+
+class Scoring:
+    """Score whole leagues."""
+
+    def setup(self, scale: Scale):
+        """Create the leagues."""
+        self.leagues = [
+            SyntheticLeague(scale.teams, scale.weeks, seed=seed, league_id=seed)
+            for seed in range(scale.leagues)
+        ]
+
+    def time_get_best_ball_scores(self):
+        """Score every week of every league."""
+        for league in self.leagues:
+            get_best_ball_scores(league, max_workers=1)
+
+
+class Validation:
+    """Compare submitted csv rankings to ESPN's draft boards."""
+
+    def setup(self, scale: Scale):
+        """Write a csv and html board per team."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.tmp_dir.name)
+        self.player_index = PlayerIndex()
+        self.teams = [f"team_{index}" for index in range(scale.leagues * scale.teams)]
+        for seed, team in enumerate(self.teams):
+            ranking = synthetic_draft_ranking(scale.players, seed)
+            ranking.to_csv(self.folder / f"{team}.csv", index=False)
+            (self.folder / f"{team}.html").write_text(
+                synthetic_html_board(ranking, seed=seed)
+            )
+
+    def time_compare_rankings(self):
+        """Load and compare every team's rankings."""
+        for team in self.teams:
+            compare_rankings(
+                load_csv_draft_order(team, self.player_index, self.folder),
+                load_html_draft_order(team, self.player_index, self.folder),
+            )
+
+    def teardown(self, scale: Scale):
+        """Remove the boards."""
+        self.tmp_dir.cleanup()
+
+
+class DraftRetrospective:
+    """Value every pick of a draft against the next players taken."""
+
+    def setup(self, scale: Scale):
+        """Create a season of points and a snake draft of random players."""
+        rng = np.random.default_rng(0)
+        eligible = np.zeros((scale.players, 4), dtype=bool)
+        eligible[np.arange(scale.players), rng.integers(0, 4, scale.players)] = True
+        self.week_points = WeekPoints(
+            player_ids=np.arange(scale.players),
+            points=rng.uniform(0, 30, (scale.players, scale.weeks)),
+            eligible=eligible,
+        )
+
+        snake = [np.arange(scale.teams), np.arange(scale.teams)[::-1]]
+        self.pick_teams = np.concatenate(
+            [snake[round_index % 2] for round_index in range(12)]
+        )
+        self.pick_players = rng.permutation(scale.players)[: len(self.pick_teams)]
+
+    def time_draft_retrospective(self):
+        """Score ten alternatives for every pick."""
+        draft_retrospective(
+            self.pick_teams,
+            self.pick_players,
+            self.week_points,
+            n_alternatives=10,
+            position_limits={"QB": 12, "RB": 12, "WR": 12, "TE": 12},
+        )
+
+
+class RankingStages:
+    """Run the create_ranking stages that rank and reduce the data."""
+
+    def setup(self, scale: Scale):
+        """Create ranking inputs."""
+        try:
+            from ..my_order import create_ranking
+        except ImportError as error:
+            raise SkipBenchmark(error) from error
+
+        self.create_ranking = create_ranking
+        self.data = synthetic_ranking_data(scale.players)
+
+    def time_create_position_ranking(self):
+        """Rank one weighting within positions."""
+        self.create_ranking._create_position_ranking(
+            self.data["position"],
+            [self.data["adp_position_rank"], self.data["depth_position_rank"]],
+        )
+
+    def time_reduce_and_cleanup(self):
+        """Reduce and clean up one submission."""
+        data = self.data.assign(position_rank=self.data["depth_position_rank"])
+        self.create_ranking._final_cleanup(
+            self.create_ranking._reduce_data(data, POSITION_LIMITS, league_size=9)
+        )
+
+
+class RankingEngine:
+    """Rank many configurations and read depth charts."""
+
+    def setup(self, scale: Scale):
+        """Create ranking inputs and depth chart csv lines."""
+        self.data = synthetic_ranking_data(scale.players)
+        self.weights = np.random.default_rng(0).random((RANKING_WEIGHTS, 2))
+        self.league_sizes = list(range(8, 8 + scale.leagues))
+
+        self.depth_chart = []
+        for team in range(32 * scale.leagues):
+            self.depth_chart.append('"Arizona Cardinals"')
+            self.depth_chart.append('"ECR","Quarterbacks","ECR","Running Backs"')
+            self.depth_chart.extend(
+                f'"{depth}","QB {team} {depth}","{depth}","RB {team} {depth}"'
+                for depth in range(1, 6)
+            )
+            self.depth_chart.append('""')
+
+    def time_rank_submissions(self):
+        """Rank every weighting for every league size."""
+        rank_submissions(
+            self.data,
+            ["adp_position_rank", "depth_position_rank"],
+            self.weights,
+            self.league_sizes,
+            [POSITION_LIMITS] * len(self.league_sizes),
+        )
+
+    def time_iter_depth_chart_records(self):
+        """Parse a depth chart csv."""
+        for _ in iter_depth_chart_records(self.depth_chart):
+            pass
+
+
+class Startup:
+    """Start the command line tool in a fresh interpreter."""
+
+    def setup(self, scale: Scale):
+        """Find the folder to run the tool from, skipping without its imports."""
+        for modules in SUBCOMMAND_IMPORTS.values():
+            for module in modules:
+                try:
+                    importlib.import_module(module)
+                except ImportError as error:
+                    raise SkipBenchmark(error) from error
+
+        self.root = Path(__file__).parents[2]
+
+    def _run(self, *args: str):
+        """Run python with args and wait for it to exit."""
+        subprocess.run(
+            [sys.executable, *args], cwd=self.root, check=True, capture_output=True
+        )
+
+    def time_cli_help(self):
+        """Parse the arguments and print help."""
+        self._run("-m", "espn_best_ball", "score", "--help")
+
+    def time_score_imports(self):
+        """Load what the score subcommand imports."""
+        self._run("-c", f"import {', '.join(SUBCOMMAND_IMPORTS['score'])}")
+
+    def time_rank_imports(self):
+        """Load what the rank subcommand imports."""
+        self._run("-c", f"import {', '.join(SUBCOMMAND_IMPORTS['rank'])}")
+
+    def time_validate_imports(self):
+        """Load what the validate subcommand imports."""
+        self._run("-c", f"import {', '.join(SUBCOMMAND_IMPORTS['validate'])}")
+
+    def time_fetch_adp_imports(self):
+        """Load what the fetch-adp subcommand imports."""
+        self._run("-c", f"import {', '.join(SUBCOMMAND_IMPORTS['fetch_adp'])}")
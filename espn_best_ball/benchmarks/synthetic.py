@@ -0,0 +1,202 @@
+"""Synthetic leagues, rankings and draft boards for benchmarks."""
+
+import random
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ELIGIBLE_SLOTS = {
+    "QB": ["QB", "OP", "BE"],
+    "RB": ["RB", "RB/WR", "RB/WR/TE", "OP", "BE"],
+    "WR": ["RB/WR", "WR", "WR/TE", "RB/WR/TE", "OP", "BE"],
+    "TE": ["WR/TE", "TE", "RB/WR/TE", "OP", "BE"],
+}
+ROSTER_SIZES = {"QB": 2, "RB": 5, "WR": 5, "TE": 2}
+POSITION_NAMES = {
+    "QB": "Quarterback",
+    "RB": "Running Back",
+    "WR": "Wide Receiver",
+    "TE": "Tight End",
+}
+FREE_AGENTS_PER_TEAM = 12
+
+
+@dataclass
+class Scale:
+    """How big the synthetic data is."""
+
+    teams: int
+    weeks: int
+    leagues: int
+    players: int
+
+
+SCALES = {
+    "small": Scale(teams=10, weeks=4, leagues=1, players=300),
+    "medium": Scale(teams=16, weeks=17, leagues=2, players=600),
+    "large": Scale(teams=16, weeks=17, leagues=8, players=2000),
+}
+
+
+def synthetic_player(
+    rng: random.Random, player_id: int, position: str, zero_rate: float = 0.15
+) -> SimpleNamespace:
+    """Create a BoxPlayer-like player, scoring 0 with probability zero_rate."""
+    points = 0.0 if rng.random() < zero_rate else round(rng.uniform(-2, 35), 2)
+    projected_points = round(rng.uniform(0, 25), 2)
+
+    return SimpleNamespace(
+        playerId=player_id,
+        name=f"Player {player_id}",
+        position=position,
+        eligibleSlots=list(ELIGIBLE_SLOTS[position]),
+        points=points,
+        projected_points=projected_points,
+        projected_avg_points=projected_points,
+        projected_total_points=projected_points * 17,
+    )
+
+
+def synthetic_roster(rng: random.Random, first_player_id: int) -> List[SimpleNamespace]:
+    """Create a shuffled best ball roster at the league's position limits."""
+    roster = [
+        synthetic_player(rng, first_player_id + index, position)
+        for index, position in enumerate(
+            position for position, size in ROSTER_SIZES.items() for _ in range(size)
+        )
+    ]
+    rng.shuffle(roster)
+
+    return roster
+
+
+def synthetic_free_agents(
+    rng: random.Random, first_player_id: int, n_players: int
+) -> List[SimpleNamespace]:
+    """Create a free agent pool in ESPN's order."""
+    positions = list(ROSTER_SIZES)
+    return [
+        synthetic_player(rng, first_player_id + index, rng.choice(positions), 0.3)
+        for index in range(n_players)
+    ]
+
+
+class SyntheticLeague:
+    """League-like object serving synthetic box scores and free agents."""
+
+    def __init__(self, n_teams: int, n_weeks: int, seed: int = 0, league_id: int = 0):
+        """Initialize a new SyntheticLeague instance."""
+        rng = random.Random(seed)
+        self.league_id = league_id
+        self.year = 2022
+        self.current_week = n_weeks + 1
+        self.teams = [
+            SimpleNamespace(team_id=index + 1, team_name=f"Team {index + 1}")
+            for index in range(n_teams)
+        ]
+        self._box_scores: Dict[int, List[SimpleNamespace]] = {}
+        self._free_agents: Dict[int, List[SimpleNamespace]] = {}
+
+        player_id = 0
+        for week in range(1, n_weeks + 1):
+            lineups = []
+            for team in self.teams:
+                lineups.append((team, synthetic_roster(rng, player_id)))
+                player_id += sum(ROSTER_SIZES.values())
+            if len(lineups) % 2:
+                lineups.append((0, []))
+
+            self._box_scores[week] = [
+                SimpleNamespace(
+                    home_team=home_team,
+                    home_lineup=home_lineup,
+                    away_team=away_team,
+                    away_lineup=away_lineup,
+                )
+                for (home_team, home_lineup), (away_team, away_lineup) in zip(
+                    lineups[0::2], lineups[1::2]
+                )
+            ]
+            n_free_agents = n_teams * FREE_AGENTS_PER_TEAM
+            self._free_agents[week] = synthetic_free_agents(
+                rng, player_id, n_free_agents
+            )
+            player_id += n_free_agents
+
+    def box_scores(self, week: int) -> List[SimpleNamespace]:
+        """Get the box scores for a week."""
+        return self._box_scores[week]
+
+    def free_agents(
+        self, week: Optional[int] = None, **kwargs
+    ) -> List[SimpleNamespace]:
+        """Get the free agents for a week."""
+        return list(self._free_agents[week or self.current_week])
+
+
+def synthetic_draft_ranking(n_players: int, seed: int = 0) -> pd.DataFrame:
+    """Create a submitted csv draft ranking with unique player names."""
+    rng = np.random.default_rng(seed)
+    positions = rng.choice(
+        list(ROSTER_SIZES), size=n_players, p=[0.15, 0.35, 0.35, 0.15]
+    )
+    ranking = pd.DataFrame(
+        {
+            "player_first_name": [f"first{index}" for index in range(n_players)],
+            "player_last_name": [f"last{index}" for index in range(n_players)],
+            "team_name": rng.choice(["BUF", "KC", "SF", "DAL"], size=n_players),
+            "position": positions,
+            "overall_rank": np.arange(1, n_players + 1),
+        }
+    )
+    ranking["position_rank"] = ranking.groupby("position").cumcount() + 1
+
+    return ranking
+
+
+def synthetic_html_board(
+    draft_ranking: pd.DataFrame, swap_rate: float = 0.05, seed: int = 0
+) -> str:
+    """Render a ranking as an ESPN draft board, swapping some neighbours."""
+    rng = random.Random(seed)
+    rows = list(
+        zip(
+            draft_ranking["player_first_name"],
+            draft_ranking["player_last_name"],
+            draft_ranking["position"],
+        )
+    )
+    for index in range(len(rows) - 1):
+        if rng.random() < swap_rate:
+            rows[index], rows[index + 1] = rows[index + 1], rows[index]
+
+    return "".join(
+        f'<tr><td><div title="Rank">{rank}</div></td><td>'
+        f'<div aria-label="undefined {POSITION_NAMES[position]}">'
+        f'<a class="AnchorLink link" tabindex="0">{first.title()}\n'
+        f"    {last.title()}</a>"
+        f'<span class="playerpos ttu">{position.lower()}</span></div></td></tr>\n'
+        for rank, (first, last, position) in enumerate(rows, start=1)
+    )
+
+
+def synthetic_ranking_data(n_players: int, seed: int = 0) -> pd.DataFrame:
+    """Create depth chart performance merged with ADP, ready to be ranked."""
+    rng = np.random.default_rng(seed)
+    data = synthetic_draft_ranking(n_players, seed).drop(
+        columns=["overall_rank", "position_rank"]
+    )
+    data["depth_position_rank"] = data.groupby("position").cumcount() + 1
+    data["adp_position_rank"] = (
+        data.assign(adp=rng.permutation(n_players))
+        .sort_values("adp")
+        .groupby("position")
+        .cumcount()
+        .reindex(data.index)
+        + 1
+    )
+
+    return data
@@ -0,0 +1,152 @@
+"""The espn-best-ball command line tool.
+
+Subcommands import what they need when they run, so starting the tool and
+parsing its arguments only loads the standard library.
+"""
+
+import argparse
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+
+def _positive_int(value: str) -> int:
+    """Parse an integer argument that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, received: {value}")
+
+    return number
+
+
+def _score(args: argparse.Namespace) -> int:
+    """Score a league's best ball weeks and write them as csv."""
+    from .league.response_cache import CachedLeague, ResponseCache
+    from .league.results_store import ResultsStore
+    from .league.rough_best_ball_score import get_best_ball_scores
+
+    league = CachedLeague(args.league_id, args.year, ResponseCache(args.cache))
+    store = ResultsStore(args.results, league_id=args.league_id, year=args.year)
+    scores = get_best_ball_scores(
+        league, max_workers=args.max_workers, store=store, last_week=args.week
+    )
+    scores.to_csv(args.output)
+    print(f"Scored {scores.shape[1]} weeks, written to {args.output}")
+
+    return 0
+
+
+def _rank(args: argparse.Namespace) -> int:
+    """Create a draft ranking submission."""
+    from .my_order.create_ranking import write_submission
+
+    write_submission(
+        args.output,
+        league_size=args.league_size,
+        ranking_factors=args.factors,
+        season=args.season,
+        adp_warehouse=args.adp_warehouse,
+        refresh=args.refresh,
+    )
+
+    return 0
+
+
+def _validate(args: argparse.Namespace) -> int:
+    """Validate submitted rankings against ESPN's draft boards."""
+    from .draft.batch_validate import write_validation_report
+
+    report = write_validation_report(
+        args.league_folders, args.report, max_workers=args.max_workers
+    )
+
+    return 1 if report["teams_with_mismatches"] or report["errors"] else 0
+
+
+def _fetch_adp(args: argparse.Namespace) -> int:
+    """Fetch ADP into the local warehouse."""
+    from .my_order.adp_warehouse import ingest_adp
+
+    adp = ingest_adp(
+        args.warehouse,
+        args.scoring_formats,
+        args.years,
+        args.team_counts,
+        max_workers=args.max_workers,
+    )
+    print(f"Wrote {len(adp)} ADP rows to {args.warehouse}")
+
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the parser for every subcommand."""
+    parser = argparse.ArgumentParser(prog="espn-best-ball", description=__doc__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    score = subparsers.add_parser("score", help=_score.__doc__)
+    score.add_argument("league_id", type=int)
+    score.add_argument("--year", type=int, default=2022)
+    score.add_argument(
+        "--week", type=_positive_int, default=None, help="last week to score"
+    )
+    score.add_argument("--cache", type=Path, default=Path("cache"))
+    score.add_argument("--results", type=Path, default=Path("results"))
+    score.add_argument("--output", type=Path, default=Path("hackathon_points.csv"))
+    score.add_argument("--max-workers", type=int, default=4)
+    score.set_defaults(handler=_score)
+
+    rank = subparsers.add_parser("rank", help=_rank.__doc__)
+    rank.add_argument("--season", type=int, default=2022)
+    rank.add_argument("--league-size", type=int, default=9)
+    rank.add_argument(
+        "--factors", nargs="+", default=["adp_position_rank", "depth_position_rank"]
+    )
+    rank.add_argument(
+        "--adp-warehouse", type=Path, default=None, help="read ADP from a warehouse"
+    )
+    rank.add_argument(
+        "--refresh",
+        nargs="*",
+        metavar="STAGE",
+        help="stages to run again, without names the ones fetching from the network",
+    )
+    rank.add_argument("--output", type=Path, default=Path("mason_g.csv"))
+    rank.set_defaults(handler=_rank)
+
+    validate = subparsers.add_parser("validate", help=_validate.__doc__)
+    validate.add_argument(
+        "league_folders",
+        nargs="*",
+        type=Path,
+        default=[Path(__file__).parent / "draft"],
+        help="folders holding draft_order/ and input_draft_order/",
+    )
+    validate.add_argument("--report", type=Path, default=Path("draft_validation.json"))
+    validate.add_argument("--max-workers", type=int, default=None)
+    validate.set_defaults(handler=_validate)
+
+    fetch_adp = subparsers.add_parser("fetch-adp", help=_fetch_adp.__doc__)
+    fetch_adp.add_argument("years", nargs="+", type=int)
+    fetch_adp.add_argument(
+        "--scoring-formats", nargs="+", default=["ppr", "half-ppr", "standard"]
+    )
+    fetch_adp.add_argument("--team-counts", nargs="+", type=int, default=[12])
+    fetch_adp.add_argument(
+        "--warehouse", type=Path, default=Path("cache") / "adp_warehouse"
+    )
+    fetch_adp.add_argument("--max-workers", type=int, default=4)
+    fetch_adp.set_defaults(handler=_fetch_adp)
+
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run a subcommand."""
+    args = build_parser().parse_args(argv)
+    handler: Callable[[argparse.Namespace], int] = args.handler
+
+    return handler(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,176 @@
+"""Validate draft orders for many leagues."""
+
+import argparse
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from ..player_index import PlayerIndex
+from .validate_draft_order import (
+    align_rankings,
+    load_csv_draft_order,
+    load_html_draft_order,
+)
+
+CSV_FOLDER = "draft_order"
+HTML_FOLDER = "input_draft_order"
+
+
+@dataclass
+class TeamDraftOrder:
+    """A team's submitted csv and espn html draft order."""
+
+    league: str
+    team: str
+    csv_folder: Path
+    html_folder: Path
+    number_of_teams: int
+
+
+@dataclass
+class TeamReport:
+    """Validation result for a single team."""
+
+    league: str
+    team: str
+    seconds: float
+    mismatches: List[Dict] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def find_draft_orders(league_folders: Sequence[Path]) -> List[TeamDraftOrder]:
+    """Find every team with both a csv and html draft order in each league folder.
+
+    A league folder holds ``draft_order/<team>.csv`` and
+    ``input_draft_order/<team>.html``. The league size is the number of csvs.
+    """
+    draft_orders = []
+    for league_folder in league_folders:
+        league_folder = Path(league_folder)
+        csv_folder = league_folder / CSV_FOLDER
+        html_folder = league_folder / HTML_FOLDER
+        teams = sorted(file.stem for file in csv_folder.glob("*.csv"))
+        for team in teams:
+            draft_orders.append(
+                TeamDraftOrder(
+                    league=str(league_folder),
+                    team=team,
+                    csv_folder=csv_folder,
+                    html_folder=html_folder,
+                    number_of_teams=len(teams),
+                )
+            )
+
+    return draft_orders
+
+
+def validate_team(draft_order: TeamDraftOrder, player_index: PlayerIndex) -> TeamReport:
+    """Compare a team's csv draft order to espn and time it."""
+    start = time.perf_counter()
+    report = TeamReport(league=draft_order.league, team=draft_order.team, seconds=0.0)
+    try:
+        csv_ranking, html_ranking, test = align_rankings(
+            load_csv_draft_order(
+                draft_order.team, player_index, draft_order.csv_folder
+            ),
+            load_html_draft_order(
+                draft_order.team, player_index, draft_order.html_folder
+            ),
+            draft_order.number_of_teams,
+        )
+    except (OSError, KeyError, ValueError) as error:
+        report.error = f"{type(error).__name__}: {error}"
+    else:
+        csv_ranking = csv_ranking.loc[test]
+        html_ranking = html_ranking.loc[test]
+        report.mismatches = [
+            {
+                "rank": int(rank) + 1,
+                "csv_name": f"{first_name}_{last_name}".lower(),
+                "csv_position": csv_position,
+                "espn_name": espn_name,
+                "espn_position": espn_position.upper(),
+            }
+            for rank, first_name, last_name, csv_position, espn_name, espn_position in zip(
+                csv_ranking.index,
+                csv_ranking["player_first_name"],
+                csv_ranking["player_last_name"],
+                csv_ranking["position"],
+                html_ranking["name"],
+                html_ranking["position"],
+            )
+        ]
+
+    report.seconds = time.perf_counter() - start
+
+    return report
+
+
+def validate_leagues(
+    league_folders: Sequence[Path],
+    max_workers: Optional[int] = None,
+    player_index: Optional[PlayerIndex] = None,
+) -> Dict:
+    """Validate every team in the league folders on a process pool.
+
+    Names are matched through ``player_index``, an empty index by default.
+    Returns a report with each team's mismatches and timing, plus the wall clock
+    time for the whole batch.
+    """
+    start = time.perf_counter()
+    draft_orders = find_draft_orders(league_folders)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        reports = list(
+            executor.map(
+                validate_team, draft_orders, repeat(player_index or PlayerIndex())
+            )
+        )
+
+    return {
+        "seconds": time.perf_counter() - start,
+        "teams": len(reports),
+        "teams_with_mismatches": sum(bool(report.mismatches) for report in reports),
+        "errors": sum(report.error is not None for report in reports),
+        "reports": [asdict(report) for report in reports],
+    }
+
+
+def write_validation_report(
+    league_folders: Sequence[Path], report_path: Path, max_workers: Optional[int] = None
+) -> Dict:
+    """Validate league folders, write the json report and print a summary of it."""
+    report = validate_leagues(league_folders, max_workers=max_workers)
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(
+        f"{report['teams_with_mismatches']} of {report['teams']} teams have "
+        f"mismatches, {report['errors']} errors, written to {report_path}"
+    )
+
+    return report
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Validate league folders and write a json mismatch report."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "league_folders",
+        nargs="*",
+        type=Path,
+        default=[Path(__file__).parent],
+        help="folders holding draft_order/ and input_draft_order/",
+    )
+    parser.add_argument("--report", type=Path, default=Path("draft_validation.json"))
+    parser.add_argument("--max-workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    write_validation_report(args.league_folders, args.report, args.max_workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""Simulate best available auto drafts."""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..player_index import MISSING_PLAYER_ID, PlayerIndex
+from .validate_draft_order import draft_order_csv_folder, load_csv_draft_order
+
+POSITIONS = ("QB", "RB", "WR", "TE")
+POSITION_LIMITS = {"QB": 2, "RB": 5, "WR": 5, "TE": 2}
+DEFAULT_ROUNDS = 12
+DEFAULT_DRAFTS_PER_TASK = 1_000
+
+
+@dataclass
+class DraftRankings:
+    """Every team's submitted ranking as player ids."""
+
+    team_names: List[str]
+    players: pd.DataFrame
+    rankings: np.ndarray
+
+    @property
+    def player_positions(self) -> np.ndarray:
+        """Return the position code of each player id."""
+        return self.players["position_code"].to_numpy()
+
+
+def load_draft_rankings(
+    folder: Path = draft_order_csv_folder, player_index: Optional[PlayerIndex] = None
+) -> DraftRankings:
+    """Load every team's csv ranking in a folder as integer player ids.
+
+    Players are identified by their ``player_index`` id, an empty index by
+    default, and rankings are padded with -1 to the longest list. Positions that
+    are not drafted, like K and D/ST, are dropped.
+    """
+    team_names = sorted(file.stem for file in Path(folder).glob("*.csv"))
+    player_index = player_index or PlayerIndex()
+    team_rankings = []
+    for team in team_names:
+        ranking = load_csv_draft_order(team, player_index, Path(folder)).dropna(
+            how="all"
+        )
+        ranking = ranking.loc[
+            ranking["position"].isin(POSITIONS)
+            & (ranking["player_id"] != MISSING_PLAYER_ID)
+        ]
+        ranking = ranking.sort_values(by="overall_rank", kind="stable")
+        team_rankings.append(
+            pd.DataFrame(
+                {
+                    "player_id": ranking["player_id"],
+                    "name": ranking["player_first_name"]
+                    + "_"
+                    + ranking["player_last_name"],
+                    "position": ranking["position"],
+                    "team_name": ranking.get("team_name", ranking.get("team")),
+                }
+            ).drop_duplicates(subset="player_id")
+        )
+
+    players = (
+        pd.concat(team_rankings, ignore_index=True)
+        .groupby("player_id", sort=False, as_index=False)
+        .first()
+    )
+    players["position_code"] = players["position"].map(POSITIONS.index)
+    player_indices = pd.Series(players.index, index=players["player_id"])
+
+    rankings = np.full(
+        (len(team_names), max((len(x) for x in team_rankings), default=0)), -1
+    )
+    for team_index, ranking in enumerate(team_rankings):
+        rankings[team_index, : len(ranking)] = player_indices[ranking["player_id"]]
+
+    return DraftRankings(team_names=team_names, players=players, rankings=rankings)
+
+
+def simulate_drafts(
+    draft_rankings: DraftRankings,
+    draft_orders: np.ndarray,
+    rounds: int = DEFAULT_ROUNDS,
+    position_limits: Dict[str, int] = POSITION_LIMITS,
+    rankings: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Run snake drafts for each row of draft orders at once.
+
+    ``draft_orders`` has shape (draft x slot) holding the team picking first,
+    second and so on in round 1. On every pick the team takes the highest player
+    in its ranking that is still available and would not exceed the position
+    limits. ``rankings`` replaces the teams' rankings, and can give each draft
+    its own with shape (draft x team x player). Returns the player ids taken
+    with shape (draft x team x round), -1 when a team's ranking has nobody left
+    it can take.
+    """
+    n_drafts, n_teams = draft_orders.shape
+    drafts = np.arange(n_drafts)
+    if rankings is None:
+        rankings = draft_rankings.rankings
+    rankings = np.broadcast_to(rankings, (n_drafts,) + rankings.shape[-2:])
+    positions = draft_rankings.player_positions
+    limits = np.array([position_limits.get(position, 0) for position in POSITIONS])
+
+    available = np.ones((n_drafts, len(positions) + 1), dtype=bool)
+    available[:, -1] = False
+    counts = np.zeros((n_drafts, n_teams, len(POSITIONS)), dtype=np.int64)
+    picks = np.full((n_drafts, n_teams, rounds), -1)
+    position_of = np.append(positions, 0)
+
+    for round_index in range(rounds):
+        slots = range(n_teams) if round_index % 2 == 0 else reversed(range(n_teams))
+        for slot in slots:
+            team = draft_orders[:, slot]
+            ids = rankings[drafts, team]
+            allowed = counts[drafts, team] < limits
+            can_pick = (
+                available[drafts[:, None], ids]
+                & allowed[drafts[:, None], position_of[ids]]
+            )
+            has_pick = can_pick.any(axis=1)
+            player = np.where(
+                has_pick, ids[drafts, can_pick.argmax(axis=1)], len(positions)
+            )
+
+            available[drafts, player] = False
+            counts[drafts[has_pick], team[has_pick], positions[player[has_pick]]] += 1
+            picks[drafts, team, round_index] = np.where(has_pick, player, -1)
+
+    return picks
+
+
+def expected_rosters(
+    draft_rankings: DraftRankings,
+    n_drafts: int = 10_000,
+    rounds: int = DEFAULT_ROUNDS,
+    position_limits: Dict[str, int] = POSITION_LIMITS,
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    drafts_per_task: int = DEFAULT_DRAFTS_PER_TASK,
+) -> pd.DataFrame:
+    """Simulate drafts with random orders and summarize each team's roster.
+
+    Returns one row per team, draft slot and player drafted there, with the
+    probability the team takes that player when picking from that slot and the
+    average round they go in.
+    """
+    task_sizes = [drafts_per_task] * (n_drafts // drafts_per_task)
+    if n_drafts % drafts_per_task:
+        task_sizes.append(n_drafts % drafts_per_task)
+    seeds = np.random.SeedSequence(seed).spawn(len(task_sizes))
+
+    args = [
+        (draft_rankings, task_size, task_seed, rounds, position_limits)
+        for task_size, task_seed in zip(task_sizes, seeds)
+    ]
+    if max_workers == 1:
+        task_counts = [_count_draft_picks(*task_args) for task_args in args]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            task_counts = list(executor.map(_count_draft_picks, *zip(*args)))
+
+    pick_counts = sum(counts for counts, _, _ in task_counts)
+    round_sums = sum(rounds_taken for _, rounds_taken, _ in task_counts)
+    slot_counts = sum(slots for _, _, slots in task_counts)
+
+    team, slot, player = np.nonzero(pick_counts)
+    players = draft_rankings.players
+    roster = pd.DataFrame(
+        {
+            "team": np.array(draft_rankings.team_names)[team],
+            "draft_slot": slot + 1,
+            "name": players["name"].to_numpy()[player],
+            "team_name": players["team_name"].to_numpy()[player],
+            "position": players["position"].to_numpy()[player],
+            "probability": pick_counts[team, slot, player] / slot_counts[team, slot],
+            "average_round": round_sums[team, slot, player]
+            / pick_counts[team, slot, player],
+        }
+    )
+
+    return roster.sort_values(
+        by=["team", "draft_slot", "average_round", "probability"],
+        ascending=[True, True, True, False],
+        ignore_index=True,
+    )
+
+
+def _count_draft_picks(
+    draft_rankings: DraftRankings,
+    n_drafts: int,
+    seed: np.random.SeedSequence,
+    rounds: int,
+    position_limits: Dict[str, int],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Run a batch of randomly ordered drafts and count picks per team and slot.
+
+    Returns pick counts and summed 1-based rounds with shape
+    (team x slot x player), and how often each team drew each slot.
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(draft_rankings.team_names)
+    n_players = len(draft_rankings.players)
+
+    draft_orders = rng.permuted(
+        np.broadcast_to(np.arange(n_teams), (n_drafts, n_teams)), axis=1
+    )
+    picks = simulate_drafts(draft_rankings, draft_orders, rounds, position_limits)
+    team_slots = np.argsort(draft_orders, axis=1)
+
+    team = np.broadcast_to(np.arange(n_teams)[None, :, None], picks.shape)
+    slot = np.broadcast_to(team_slots[:, :, None], picks.shape)
+    round_number = np.broadcast_to(np.arange(1, rounds + 1), picks.shape)
+    taken = picks >= 0
+    cell = (team * n_teams + slot) * n_players + picks
+
+    size = n_teams * n_teams * n_players
+    pick_counts = np.bincount(cell[taken], minlength=size)
+    round_sums = np.bincount(cell[taken], weights=round_number[taken], minlength=size)
+    slot_counts = np.zeros((n_teams, n_teams), dtype=np.int64)
+    np.add.at(slot_counts, (np.arange(n_teams)[None, :], team_slots), 1)
+
+    shape = (n_teams, n_teams, n_players)
+    return pick_counts.reshape(shape), round_sums.reshape(shape), slot_counts
@@ -0,0 +1,281 @@
+"""Draft retrospectives with counterfactual pick values."""
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from espn_api.football import League
+
+from ..league.batch_lineup import POSITIONS, best_ball_totals
+from ..league.fetch import DEFAULT_MAX_WORKERS
+from ..league.player_store import PlayerWeekStore
+from ..league.response_cache import CachedLeague, ResponseCache
+from ..league.rough_best_ball_score import fetch_week_store
+from .draft_simulator import POSITION_LIMITS
+
+DEFAULT_ALTERNATIVES = 5
+
+
+@dataclass
+class WeekPoints:
+    """Points with shape (player x week) and position masks for each player."""
+
+    player_ids: np.ndarray
+    points: np.ndarray
+    eligible: np.ndarray
+
+    @property
+    def positions(self) -> np.ndarray:
+        """Return each player's first eligible position code, -1 for none."""
+        return np.where(self.eligible.any(axis=1), self.eligible.argmax(axis=1), -1)
+
+    def index(self, player_ids: Sequence[int]) -> np.ndarray:
+        """Return the row of each player id, -1 for players without points."""
+        player_ids = np.asarray(player_ids)
+        rows = np.minimum(
+            np.searchsorted(self.player_ids, player_ids), len(self.player_ids) - 1
+        )
+        return np.where(self.player_ids[rows] == player_ids, rows, -1)
+
+
+def store_week_points(store: PlayerWeekStore) -> WeekPoints:
+    """Collect every player's weekly points from lineups and free agents.
+
+    Weeks a player is in neither score 0.
+    """
+    player_ids, rows = np.unique(store.player_ids, return_inverse=True)
+    weeks, week_index = np.unique(store.weeks, return_inverse=True)
+
+    points = np.zeros((len(player_ids), len(weeks)), dtype=np.float32)
+    points[rows, week_index] = store.points
+    eligible = np.zeros((len(player_ids), len(POSITIONS)), dtype=bool)
+    eligible[rows] = store.eligible(np.arange(len(store)))
+
+    return WeekPoints(player_ids=player_ids, points=points, eligible=eligible)
+
+
+def available_alternatives(
+    pick_teams: np.ndarray,
+    pick_players: np.ndarray,
+    positions: np.ndarray,
+    ranking: np.ndarray,
+    n_alternatives: int = DEFAULT_ALTERNATIVES,
+    position_limits: Dict[str, int] = POSITION_LIMITS,
+) -> np.ndarray:
+    """Find the first players in the ranking each pick could have made instead.
+
+    Picks are in draft order and players are WeekPoints rows. A player is an
+    alternative when nobody took them before the pick, and swapping them in
+    keeps the team's final roster within the position limits. Returns shape
+    (pick x alternative), padded with -1. Players the team took later are
+    skipped, and the other teams' rosters are left as they were.
+    """
+    n_picks = len(pick_players)
+    n_teams = pick_teams.max(initial=-1) + 1
+    limits = np.array([position_limits.get(position, 0) for position in POSITIONS])
+    pick_positions = positions[pick_players]
+
+    pick_time = np.full(len(positions), n_picks)
+    pick_time[pick_players] = np.arange(n_picks)
+    owner = np.full(len(positions), -1)
+    owner[pick_players] = pick_teams
+    counts = np.zeros((n_teams, len(POSITIONS)), dtype=np.int64)
+    drafted = pick_positions >= 0
+    np.add.at(counts, (pick_teams[drafted], pick_positions[drafted]), 1)
+
+    ranked_positions = positions[ranking]
+    position_code = np.maximum(ranked_positions, 0)
+    swapped_counts = (
+        counts[pick_teams][:, position_code]
+        + 1
+        - (ranked_positions[None, :] == pick_positions[:, None])
+    )
+    candidate = (
+        (pick_time[ranking][None, :] > np.arange(n_picks)[:, None])
+        & (owner[ranking][None, :] != pick_teams[:, None])
+        & (swapped_counts <= limits[position_code])
+        & (ranked_positions >= 0)
+    )
+
+    order = np.argsort(~candidate, axis=1, kind="stable")[:, :n_alternatives]
+    alternatives = np.full((n_picks, n_alternatives), -1)
+    alternatives[:, : order.shape[1]] = np.where(
+        np.take_along_axis(candidate, order, axis=1), ranking[order], -1
+    )
+
+    return alternatives
+
+
+def counterfactual_totals(
+    week_points: WeekPoints,
+    pick_teams: np.ndarray,
+    pick_players: np.ndarray,
+    alternatives: np.ndarray,
+) -> np.ndarray:
+    """Total each picking team's season with the pick swapped for each alternative.
+
+    Every counterfactual roster is scored at once, without streaming free
+    agents. Returns shape (pick x 1 + alternative) with the actual total first,
+    and NaN where there is no alternative.
+    """
+    n_picks, n_alternatives = alternatives.shape
+    pick_slot = pd.Series(pick_teams).groupby(pick_teams).cumcount().to_numpy()
+    rosters = np.full(
+        (pick_teams.max(initial=-1) + 1, pick_slot.max(initial=-1) + 1), -1
+    )
+    rosters[pick_teams, pick_slot] = pick_players
+
+    candidates = np.repeat(rosters[pick_teams][:, None, :], n_alternatives + 1, axis=1)
+    candidates[
+        np.arange(n_picks)[:, None],
+        np.arange(1, n_alternatives + 1)[None, :],
+        pick_slot[:, None],
+    ] = alternatives
+
+    # Row -1 is a player who scores nothing and fills no position
+    n_weeks = week_points.points.shape[1]
+    points = np.vstack([week_points.points, np.zeros((1, n_weeks), np.float32)])
+    eligible = np.vstack([week_points.eligible, np.zeros((1, len(POSITIONS)), bool)])
+    totals = best_ball_totals(
+        np.moveaxis(points[candidates], -1, -2), eligible[candidates][..., None, :, :]
+    ).sum(axis=-1)
+
+    has_alternative = np.column_stack([np.ones(n_picks, dtype=bool), alternatives >= 0])
+    return np.where(has_alternative, totals, np.nan)
+
+
+def draft_retrospective(
+    pick_teams: Sequence[int],
+    pick_players: Sequence[int],
+    week_points: WeekPoints,
+    ranking: Optional[Sequence[int]] = None,
+    n_alternatives: int = DEFAULT_ALTERNATIVES,
+    position_limits: Dict[str, int] = POSITION_LIMITS,
+) -> pd.DataFrame:
+    """Value every pick against the next available players.
+
+    Picks are team indexes and WeekPoints rows in draft order. Alternatives come
+    from ``ranking``, defaulting to the players taken after the pick. Returns
+    one row per pick and alternative with how many season points swapping them
+    would have added.
+    """
+    pick_teams = np.asarray(pick_teams)
+    pick_players = np.asarray(pick_players)
+    ranking = pick_players if ranking is None else np.asarray(ranking)
+    ranking = ranking[ranking >= 0]
+
+    alternatives = available_alternatives(
+        pick_teams,
+        pick_players,
+        np.append(week_points.positions, -1),
+        ranking,
+        n_alternatives,
+        position_limits,
+    )
+    totals = np.round(
+        counterfactual_totals(week_points, pick_teams, pick_players, alternatives), 2
+    )
+
+    n_picks = len(pick_players)
+    player_ids = np.append(week_points.player_ids, -1)
+    retrospective = pd.DataFrame(
+        {
+            "pick": np.repeat(np.arange(1, n_picks + 1), n_alternatives),
+            "team": np.repeat(pick_teams, n_alternatives),
+            "player_id": np.repeat(player_ids[pick_players], n_alternatives),
+            "total_points": np.repeat(totals[:, 0], n_alternatives),
+            "alternative": np.tile(np.arange(1, n_alternatives + 1), n_picks),
+            "alternative_player_id": player_ids[alternatives].ravel(),
+            "alternative_total_points": totals[:, 1:].ravel(),
+        }
+    )
+    retrospective["points_added"] = (
+        retrospective["alternative_total_points"] - retrospective["total_points"]
+    )
+
+    return retrospective.loc[alternatives.ravel() >= 0].reset_index(drop=True)
+
+
+def pick_values(retrospective: pd.DataFrame) -> pd.DataFrame:
+    """Summarize each pick by its best alternative and the points it gave up."""
+    best = retrospective.loc[
+        retrospective.groupby("pick")["points_added"].idxmax()
+    ].reset_index(drop=True)
+    best["points_lost"] = best["points_added"].clip(lower=0)
+
+    return best[
+        [
+            "pick",
+            "team",
+            "player_id",
+            "total_points",
+            "alternative_player_id",
+            "points_lost",
+        ]
+    ]
+
+
+def league_draft_retrospective(
+    league: League,
+    n_alternatives: int = DEFAULT_ALTERNATIVES,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> pd.DataFrame:
+    """Value every pick of a league's draft with its weeks so far.
+
+    Alternatives are the players drafted after each pick, and their points come
+    from the box scores and free agent lists of the weeks played.
+    """
+    week_points = store_week_points(
+        fetch_week_store(league, range(1, league.current_week), max_workers)
+    )
+
+    team_index = {team.team_id: index for index, team in enumerate(league.teams)}
+    picks: List = league.draft
+    retrospective = draft_retrospective(
+        [team_index[pick.team.team_id] for pick in picks],
+        week_points.index([pick.playerId for pick in picks]),
+        week_points,
+        n_alternatives=n_alternatives,
+    )
+
+    team_names = [team.team_name for team in league.teams]
+    player_names = {pick.playerId: pick.playerName for pick in picks}
+    retrospective["team"] = [team_names[team] for team in retrospective["team"]]
+    retrospective.insert(3, "player_name", retrospective["player_id"].map(player_names))
+    retrospective.insert(
+        7,
+        "alternative_player_name",
+        retrospective["alternative_player_id"].map(player_names),
+    )
+
+    return retrospective
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Write a league's draft retrospective and each team's costliest picks."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("league_id", type=int)
+    parser.add_argument("--year", type=int, default=2022)
+    parser.add_argument("--alternatives", type=int, default=DEFAULT_ALTERNATIVES)
+    parser.add_argument("--output", type=Path, default=Path("draft_retrospective.csv"))
+    args = parser.parse_args(argv)
+
+    league = CachedLeague(args.league_id, args.year, ResponseCache(Path("cache")))
+    retrospective = league_draft_retrospective(league, args.alternatives)
+    retrospective.to_csv(args.output, index=False)
+
+    values = pick_values(retrospective)
+    for team, team_values in values.groupby("team"):
+        worst = team_values.nlargest(3, "points_lost")
+        print(
+            f"{team}: {team_values['points_lost'].sum():.1f} points left on the board"
+        )
+        for pick in worst.itertuples():
+            print(f"  pick {pick.pick}: {pick.points_lost:.1f}")
+
+
+if __name__ == "__main__":
+    main()
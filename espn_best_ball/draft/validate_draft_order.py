@@ -1,95 +1,79 @@
 """Validate draft order."""
 
 import re
+from functools import partial
 from pathlib import Path
+from typing import Iterable, Iterator, Tuple
 
 import pandas as pd
 
+from ..player_index import PlayerIndex, canonical_first_token, canonical_name
+
 base_path = Path(__file__).parent
 # base_path = Path("./espn_best_ball/draft")
 draft_order_csv_folder = base_path / "draft_order"
 input_draft_order_html_folder = base_path / "input_draft_order"
 
+CHUNK_SIZE = 64 * 1024
+ROW_END = "</tr>"
+NAME_PATTERN = re.compile(r'tabindex="0">([^<]+)</a>')
+POSITION_PATTERN = re.compile(r'playerpos ttu">([^<]+)</span>')
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
 
-def load_csv_draft_order(team: str) -> pd.DataFrame:
+def load_csv_draft_order(
+    team: str, player_index: PlayerIndex, folder: Path = draft_order_csv_folder
+) -> pd.DataFrame:
     """Load provided csv draft order."""
-    df = pd.read_csv((draft_order_csv_folder / f"{team}.csv"))
-
-    df["player_first_name"] = (
-        df["player_first_name"]
-        .str.replace(r"\s", "_", regex=True)
-        .str.replace(r"\W", "", regex=True)
-        .str.lower()
-        .str.split("_")
-        .str[0]
-    )
+    df = pd.read_csv((folder / f"{team}.csv"))
 
-    df["player_last_name"] = (
-        df["player_last_name"]
-        .str.replace(r"\s", "_", regex=True)
-        .str.replace(r"\W", "", regex=True)
-        .str.lower()
-        .str.split("_")
-        .str[0]
+    df["player_id"] = player_index.player_ids(
+        df["player_first_name"] + " " + df["player_last_name"]
+    )
+    df["player_first_name"] = df["player_first_name"].map(
+        canonical_first_token, na_action="ignore"
+    )
+    df["player_last_name"] = df["player_last_name"].map(
+        canonical_first_token, na_action="ignore"
     )
 
     return df
 
 
-def load_html_draft_order(team: str) -> pd.DataFrame:
+def iter_html_rows(chunks: Iterable[str]) -> Iterator[str]:
+    """Yield each table row from chunks of html, holding one row at a time."""
+    buffer = ""
+    for chunk in chunks:
+        *rows, buffer = (buffer + chunk).split(ROW_END)
+        yield from rows
+
+    yield buffer
+
+
+def iter_html_draft_order(chunks: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """Yield the name and position of each ranked player in chunks of html."""
+    for row in iter_html_rows(chunks):
+        name = NAME_PATTERN.search(row)
+        position = POSITION_PATTERN.search(row)
+        if name is None or position is None:
+            return
+
+        yield (
+            WHITESPACE_PATTERN.sub("_", name.group(1).lower()),
+            WHITESPACE_PATTERN.sub("_", position.group(1).lower()),
+        )
+
+
+def load_html_draft_order(
+    team: str, player_index: PlayerIndex, folder: Path = input_draft_order_html_folder
+) -> pd.DataFrame:
     """Load html draft order from espn."""
-    with open((input_draft_order_html_folder / f"{team}.html")) as f:
-        html_table = f.read()
-
-    rankings = []
-    start_str = 'tabindex="0">'
-    end_str = "</a>"
-    for row in html_table.split("</tr>"):
-        try:
-            rankings.append(
-                re.sub(
-                    r"\s+",
-                    "_",
-                    (
-                        re.findall(fr"{start_str}[^<]+{end_str}", row)[0]
-                        .split(start_str)[1]
-                        .split(end_str)[0]
-                    ).lower(),
-                )
-            )
-        except IndexError:
-            break
-
-    position = []
-    start_str = 'playerpos ttu">'
-    end_str = "</span>"
-    for row in html_table.split("</tr>"):
-        try:
-            position.append(
-                re.sub(
-                    r"\s+",
-                    "_",
-                    (
-                        re.findall(fr"{start_str}[^<]+{end_str}", row)[0]
-                        .split(start_str)[1]
-                        .split(end_str)[0]
-                    ).lower(),
-                )
-            )
-        except IndexError:
-            break
-
-    df = pd.DataFrame({"name": rankings, "position": position})
-    df["name"] = (
-        df["name"]
-        .str.replace(r"\s", "_", regex=True)
-        .str.replace(r"\W", "", regex=True)
-        .str.lower()
-        .str.split("_")
-        .str[0:2]
-        .str.join("_")
-        .str.replace("gabe_davis", "gabriel_davis")
-    )
+    with open((folder / f"{team}.html")) as f:
+        rankings = list(iter_html_draft_order(iter(partial(f.read, CHUNK_SIZE), "")))
+
+    df = pd.DataFrame(rankings, columns=["name", "position"])
+    df["name"] = df["name"].map(canonical_name)
+    df["player_id"] = player_index.player_ids(df["name"])
     df["position_rank"] = df.groupby("position").cumcount() + 1
 
     return df
@@ -108,31 +92,40 @@ def too_many_ranked_ahead(
     )
 
 
-def compare_rankings(csv_ranking: pd.DataFrame, html_ranking: pd.DataFrame):
-    """Compare provided rankings to what is on espn."""
+def align_rankings(
+    csv_ranking: pd.DataFrame, html_ranking: pd.DataFrame, number_of_teams: int = 9
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.Series]:
+    """Line up provided rankings with espn's, marking where the names differ."""
     csv_ranking = csv_ranking.dropna(how="all")
     csv_ranking = csv_ranking.loc[
         ~csv_ranking["position"].isin(["K", "D/ST", "DST", "DEF"])
     ]
-    csv_ranking = csv_ranking.loc[~too_many_ranked_ahead(csv_ranking)].reset_index()
-    html_ranking = html_ranking.loc[~too_many_ranked_ahead(html_ranking)].reset_index()
+    csv_ranking = csv_ranking.loc[
+        ~too_many_ranked_ahead(csv_ranking, number_of_teams)
+    ].reset_index()
+    html_ranking = html_ranking.loc[
+        ~too_many_ranked_ahead(html_ranking, number_of_teams)
+    ].reset_index()
 
-    name = (
-        csv_ranking["player_first_name"].str.lower()
-        + "_"
-        + csv_ranking["player_last_name"].str.lower()
-    )
     min_length = min(len(csv_ranking), len(html_ranking))
-    test = name.iloc[0:min_length] != html_ranking.iloc[0:min_length]["name"]
-
-    return pd.concat(
-        [
-            csv_ranking.iloc[0:min_length].loc[test],
-            html_ranking.iloc[0:min_length].loc[test],
-        ],
-        axis=1,
+    test = (
+        csv_ranking.iloc[0:min_length]["player_id"]
+        != html_ranking.iloc[0:min_length]["player_id"]
     )
 
+    return csv_ranking.iloc[0:min_length], html_ranking.iloc[0:min_length], test
+
+
+def compare_rankings(
+    csv_ranking: pd.DataFrame, html_ranking: pd.DataFrame, number_of_teams: int = 9
+):
+    """Compare provided rankings to what is on espn."""
+    csv_ranking, html_ranking, test = align_rankings(
+        csv_ranking, html_ranking, number_of_teams
+    )
+
+    return pd.concat([csv_ranking.loc[test], html_ranking.loc[test]], axis=1)
+
 
 def main():
     """Run example script."""
@@ -147,10 +140,11 @@ def main():
         "leonardo_j",
         "mason_g",
     ]
+    player_index = PlayerIndex()
     for team in teams:
         print("")
-        csv_ranking = load_csv_draft_order(team)
-        html_ranking = load_html_draft_order(team)
+        csv_ranking = load_csv_draft_order(team, player_index)
+        html_ranking = load_html_draft_order(team, player_index)
 
         x = compare_rankings(csv_ranking, html_ranking)
         print(x[["player_last_name", "position", "name"]])
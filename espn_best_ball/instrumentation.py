@@ -0,0 +1,196 @@
+"""Timing spans, counters and profiling hooks."""
+
+import argparse
+import cProfile
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+
+@dataclass
+class Span:
+    """A timed call with counters such as bytes and rows."""
+
+    name: str
+    start: float
+    seconds: float = 0.0
+    thread_id: int = 0
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, **counters: int):
+        """Add to the span's counters."""
+        for name, value in counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+
+
+class Tracer:
+    """Collect spans from every thread while enabled."""
+
+    def __init__(self):
+        """Initialize a new Tracer instance."""
+        self.enabled = False
+        self.spans: List[Span] = []
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **counters: int) -> Iterator[Span]:
+        """Time the body of the context as a span named name."""
+        span = Span(
+            name,
+            time.perf_counter(),
+            thread_id=threading.get_ident(),
+            counters=dict(counters),
+        )
+        try:
+            yield span
+        finally:
+            if self.enabled:
+                span.seconds = time.perf_counter() - span.start
+                with self._lock:
+                    self.spans.append(span)
+
+    def clear(self):
+        """Drop every recorded span."""
+        with self._lock:
+            self.spans = []
+            self.origin = time.perf_counter()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Total the calls, seconds and counters of spans by name."""
+        summary: Dict[str, Dict[str, float]] = {}
+        for span in self.spans:
+            totals = summary.setdefault(span.name, {"calls": 0, "seconds": 0.0})
+            totals["calls"] += 1
+            totals["seconds"] += span.seconds
+            for name, value in span.counters.items():
+                totals[name] = totals.get(name, 0) + value
+
+        return summary
+
+    def to_json(self, path: Union[str, Path]):
+        """Write the spans and their summary as json."""
+        spans = [
+            {**asdict(span), "start": span.start - self.origin} for span in self.spans
+        ]
+        with open(path, "w") as f:
+            json.dump({"summary": self.summary(), "spans": spans}, f, indent=2)
+
+    def to_chrome_trace(self, path: Union[str, Path]):
+        """Write the spans in Chrome trace format, for chrome://tracing."""
+        pid = os.getpid()
+        events = [
+            {
+                "name": span.name,
+                "cat": span.name.split(".")[0],
+                "ph": "X",
+                "ts": (span.start - self.origin) * 1e6,
+                "dur": span.seconds * 1e6,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": span.counters,
+            }
+            for span in self.spans
+        ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+TRACER = Tracer()
+
+
+def span(name: str, **counters: int):
+    """Time the body of the context as a span of the global tracer."""
+    return TRACER.span(name, **counters)
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """Decorate a function to run in a span named name."""
+
+    def decorator(function: Callable) -> Callable:
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with TRACER.span(name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def tracing() -> Iterator[Tracer]:
+    """Record spans with the global tracer for the body of the context."""
+    TRACER.clear()
+    TRACER.enabled = True
+    try:
+        yield TRACER
+    finally:
+        TRACER.enabled = False
+
+
+@contextmanager
+def profiling(path: Optional[Union[str, Path]] = None) -> Iterator[cProfile.Profile]:
+    """Run the body of the context under cProfile, dumping stats to path."""
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        if path is not None:
+            profile.dump_stats(str(path))
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Run a module's main function with tracing and write the spans.
+
+    Options go before the module, and everything after it is passed to the
+    module as its command line arguments.
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("module", help="e.g. espn_best_ball.my_order.create_ranking")
+    parser.add_argument("--trace", type=Path, default=Path("trace.json"))
+    parser.add_argument("--format", choices=["chrome", "json"], default="chrome")
+    parser.add_argument("--profile", type=Path, default=None, help="cProfile output")
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    args = parser.parse_args(argv)
+
+    module = importlib.import_module(args.module)
+    sys.argv = [args.module, *args.args]
+    with tracing() as tracer:
+        if args.profile is not None:
+            with profiling(args.profile):
+                module.main()
+        else:
+            module.main()
+
+    if args.format == "chrome":
+        tracer.to_chrome_trace(args.trace)
+    else:
+        tracer.to_json(args.trace)
+
+    for name, totals in sorted(
+        tracer.summary().items(), key=lambda item: -item[1]["seconds"]
+    ):
+        counters = ", ".join(
+            f"{counter}={value}"
+            for counter, value in totals.items()
+            if counter not in ("calls", "seconds")
+        )
+        print(
+            f"{name:<40} {totals['calls']:>6} calls {totals['seconds']:10.3f}s"
+            f" {counters}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Batch best ball lineups."""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from espn_api.football import BoxPlayer, Player
+
+POSITIONS = ("QB", "RB", "WR", "TE")
+LINEUP_SLOTS = ("qb", "wr1", "wr2", "rb1", "rb2", "te", "flex")
+SLOT_POSITIONS = ("QB", "WR", "WR", "RB", "RB", "TE", "RB/WR/TE")
+
+_QB, _RB, _WR, _TE = range(len(POSITIONS))
+_FLEX = (_RB, _WR, _TE)
+
+
+def eligible_positions(player: Player) -> List[bool]:
+    """Return whether the player is eligible for each of POSITIONS."""
+    return [position in player.eligibleSlots for position in POSITIONS]
+
+
+def pack_rosters(
+    rosters: Sequence[Sequence[Sequence[BoxPlayer]]],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack rosters indexed by team then week into points and position masks.
+
+    Returns a (team x week x player) points array and a matching boolean mask
+    with one trailing entry per position in POSITIONS. Short rosters are padded
+    with players that are not eligible for any position.
+    """
+    n_teams = len(rosters)
+    n_weeks = max((len(weeks) for weeks in rosters), default=0)
+    n_players = max((len(lineup) for weeks in rosters for lineup in weeks), default=0)
+
+    points = np.zeros((n_teams, n_weeks, n_players))
+    eligible = np.zeros((n_teams, n_weeks, n_players, len(POSITIONS)), dtype=bool)
+    for team, weeks in enumerate(rosters):
+        for week, lineup in enumerate(weeks):
+            for index, player in enumerate(lineup):
+                points[team, week, index] = player.points
+                eligible[team, week, index] = eligible_positions(player)
+                if not eligible[team, week, index].any():
+                    print(player, "does not match any eligible roles")
+
+    return points, eligible
+
+
+def best_ball_lineups(
+    points: np.ndarray, eligible: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Pick the ideal lineup for every roster at once.
+
+    ``points`` has shape (..., players) and ``eligible`` (..., players, 4). A
+    player fills the first of POSITIONS they are eligible for. Returns the chosen player index and points for each
+    of LINEUP_SLOTS, with -1 and 0.0 where the roster cannot fill the slot.
+    """
+    if points.shape[-1] < 2:
+        padding = 2 - points.shape[-1]
+        points = np.concatenate(
+            [points, np.zeros(points.shape[:-1] + (padding,))], axis=-1
+        )
+        eligible = np.concatenate(
+            [eligible, np.zeros(eligible.shape[:-2] + (padding, len(POSITIONS)), bool)],
+            axis=-2,
+        )
+
+    primary = _primary_positions(eligible)
+
+    # Stable sorts keep the first listed player on ties, like ``max``.
+    ranked = []
+    for code in range(len(POSITIONS)):
+        key = np.where(primary == code, points, -np.inf)
+        ranked.append(np.argsort(-key, axis=-1, kind="stable"))
+
+    picks = [
+        ranked[_QB][..., 0],
+        ranked[_WR][..., 0],
+        ranked[_WR][..., 1],
+        ranked[_RB][..., 0],
+        ranked[_RB][..., 1],
+        ranked[_TE][..., 0],
+    ]
+    pick_positions = [_QB, _WR, _WR, _RB, _RB, _TE]
+
+    player_index = np.arange(points.shape[-1])
+    taken = np.zeros(points.shape, dtype=bool)
+    slot_index = []
+    for pick, code in zip(picks, pick_positions):
+        valid = np.take_along_axis(primary, pick[..., None], axis=-1)[..., 0] == code
+        taken |= (player_index == pick[..., None]) & valid[..., None]
+        slot_index.append(np.where(valid, pick, -1))
+
+    # The flex is the best remaining RB, then WR, then TE in roster order.
+    flex_key = np.where(np.isin(primary, _FLEX) & ~taken, points, -np.inf)
+    flex_order = np.argsort(primary, axis=-1, kind="stable")
+    flex_pick = np.take_along_axis(flex_key, flex_order, axis=-1).argmax(axis=-1)
+    flex = np.take_along_axis(flex_order, flex_pick[..., None], axis=-1)[..., 0]
+    flex_valid = (
+        np.take_along_axis(flex_key, flex[..., None], axis=-1)[..., 0] > -np.inf
+    )
+    slot_index.append(np.where(flex_valid, flex, -1))
+
+    slot_index = np.stack(slot_index, axis=-1)
+    slot_points = np.where(
+        slot_index >= 0,
+        np.take_along_axis(points, np.maximum(slot_index, 0), axis=-1),
+        0.0,
+    )
+
+    return slot_index, slot_points
+
+
+def best_ball_totals(points: np.ndarray, eligible: np.ndarray) -> np.ndarray:
+    """Total the ideal lineup points for every roster at once.
+
+    Gives the same points as ``best_ball_lineups`` without tracking which player
+    fills each slot. ``eligible`` only needs to broadcast against ``points``, so
+    rosters shared across leading dimensions such as simulated seasons are
+    grouped by position once and each group is sorted on its own.
+    """
+    primary = _primary_positions(eligible)
+    padded = np.concatenate(
+        [points, np.full(points.shape[:-1] + (1,), -np.inf, points.dtype)], axis=-1
+    )
+
+    best = []
+    for code, count in zip(range(len(POSITIONS)), (1, 3, 3, 2)):
+        columns = _position_columns(primary, code, count)
+        columns = columns.reshape((1,) * (points.ndim - columns.ndim) + columns.shape)
+        values = np.take_along_axis(padded, columns, axis=-1)
+        best.append(-np.sort(-values, axis=-1)[..., :count])
+
+    qbs, rbs, wrs, tes = best
+    flex = np.maximum(np.maximum(rbs[..., 2], wrs[..., 2]), tes[..., 1])
+    slots = [qbs[..., 0], wrs[..., 0], wrs[..., 1], rbs[..., 0], rbs[..., 1]]
+    slots += [tes[..., 0], flex]
+
+    totals = np.zeros(points.shape[:-1])
+    for slot in slots:
+        totals = totals + np.where(slot > -np.inf, slot, 0.0)
+
+    return totals
+
+
+def lineup_totals(slot_points: np.ndarray) -> np.ndarray:
+    """Sum slot points in lineup order."""
+    totals = np.zeros(slot_points.shape[:-1])
+    for slot in range(slot_points.shape[-1]):
+        totals = totals + slot_points[..., slot]
+
+    return totals
+
+
+def _primary_positions(eligible: np.ndarray) -> np.ndarray:
+    """Return the first eligible position code, len(POSITIONS) for none."""
+    return np.where(eligible.any(axis=-1), eligible.argmax(axis=-1), len(POSITIONS))
+
+
+def _position_columns(primary: np.ndarray, code: int, min_width: int) -> np.ndarray:
+    """Return the player columns of a position, padded with the column past the end.
+
+    The padding column lets callers append a -inf player to gather from.
+    """
+    n_players = primary.shape[-1]
+    is_position = primary == code
+    width = max(min_width, int(is_position.sum(axis=-1).max(initial=0)))
+    if width > n_players:
+        is_position = np.concatenate(
+            [
+                is_position,
+                np.zeros(is_position.shape[:-1] + (width - n_players,), bool),
+            ],
+            axis=-1,
+        )
+
+    order = np.argsort(~is_position, axis=-1, kind="stable")[..., :width]
+
+    return np.where(np.take_along_axis(is_position, order, axis=-1), order, n_players)
@@ -0,0 +1,83 @@
+"""Send a league's ESPN requests through its own session."""
+
+import copy
+import time
+from types import FunctionType, MethodType
+from typing import Any, Optional
+
+import requests
+from espn_api.requests.espn_requests import EspnFantasyRequests
+
+
+class SessionRequests:
+    """The part of the requests module espn_api uses, sent through a session.
+
+    Every request times out after ``timeout`` seconds, and once ``deadline``, a
+    ``time.monotonic`` value, has passed requests raise TimeoutError instead of
+    being sent.
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ):
+        """Initialize a new SessionRequests instance."""
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.deadline = deadline
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET request with the time left before the deadline."""
+        timeout = self.timeout
+        if self.deadline is None:
+            return self.session.get(url, timeout=timeout, **kwargs)
+
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Deadline passed before requesting {url}")
+
+        try:
+            return self.session.get(
+                url,
+                timeout=remaining if timeout is None else min(timeout, remaining),
+                **kwargs,
+            )
+        except requests.Timeout as error:
+            if time.monotonic() < self.deadline:
+                raise
+            raise TimeoutError(f"Deadline passed while requesting {url}") from error
+
+    def __getattr__(self, name: str) -> Any:
+        """Fall back to the requests module."""
+        return getattr(requests, name)
+
+
+def session_espn_requests(
+    espn_request: EspnFantasyRequests, session_requests: SessionRequests
+) -> EspnFantasyRequests:
+    """Copy a league's ESPN requester so its requests go through a session.
+
+    espn_api calls its module's ``requests.get``, so the copy gets its own
+    versions of the methods that do, with ``requests`` bound to
+    ``session_requests``. The module and every other league are left alone.
+    """
+    routed = copy.copy(espn_request)
+    for name, function in vars(EspnFantasyRequests).items():
+        if not isinstance(function, FunctionType):
+            continue
+        if "requests" not in function.__code__.co_names:
+            continue
+
+        method = FunctionType(
+            function.__code__,
+            {**function.__globals__, "requests": session_requests},
+            name,
+            function.__defaults__,
+            function.__closure__,
+        )
+        method.__kwdefaults__ = function.__kwdefaults__
+        setattr(routed, name, MethodType(method, routed))
+
+    return routed
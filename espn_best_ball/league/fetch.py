@@ -0,0 +1,75 @@
+"""Fetch league weeks."""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, List
+
+from espn_api.football import BoxPlayer, League
+from espn_api.football.box_score import BoxScore
+
+from ..instrumentation import span
+
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class WeekData:
+    """Box scores and free agents for a single week."""
+
+    week: int
+    box_scores: List[BoxScore]
+    free_agents: List[BoxPlayer]
+
+
+def fetch_weeks(
+    league: League, weeks: Iterable[int], max_workers: int = DEFAULT_MAX_WORKERS
+) -> List[WeekData]:
+    """Fetch box scores and free agents for each week on a bounded thread pool.
+
+    Every ``box_scores`` and ``free_agents`` call is its own task, so at most
+    ``max_workers`` requests are in flight and the results come back in week
+    order.
+    """
+    return list(iter_weeks(league, weeks, max_workers))
+
+
+def iter_weeks(
+    league: League, weeks: Iterable[int], max_workers: int = DEFAULT_MAX_WORKERS
+) -> Iterator[WeekData]:
+    """Fetch weeks like ``fetch_weeks``, yielding each in week order as it arrives.
+
+    A week is released once it is yielded, so a caller that packs each week and
+    drops it frees the week's objects as it goes.
+    """
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, received: {max_workers}")
+
+    weeks = list(weeks)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            (
+                week,
+                executor.submit(_fetch, "espn.box_scores", league.box_scores, week),
+                executor.submit(
+                    _fetch, "espn.free_agents", league.free_agents, week=week
+                ),
+            )
+            for week in weeks
+        ]
+        futures.reverse()
+        while futures:
+            week, box_scores, free_agents = futures.pop()
+            yield WeekData(
+                week=week,
+                box_scores=box_scores.result(),
+                free_agents=free_agents.result(),
+            )
+
+
+def _fetch(name: str, call: Callable[..., List], *args, **kwargs) -> List:
+    """Make a league call in a span counting the rows returned."""
+    with span(name) as fetch_span:
+        result = call(*args, **kwargs)
+        fetch_span.add(rows=len(result))
+
+    return result
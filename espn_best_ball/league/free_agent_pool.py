@@ -0,0 +1,71 @@
+"""Free agent pool."""
+
+from typing import Dict, List
+
+import numpy as np
+
+from .batch_lineup import SLOT_POSITIONS
+from .player_store import PlayerWeekStore, free_agent_order, slot_mask
+
+
+class FreeAgentPool:
+    """A week's scoring free agents, claimed by lineup slot.
+
+    Each position lists its eligible free agents in ``free_agent_order`` the
+    first time it claims one, and keeps the index its last claim stopped at,
+    since the free agents before it are claimed for good. Claims are shared, so
+    every position skips a free agent another position took, and claiming walks
+    each list once a week.
+    """
+
+    def __init__(self, store: PlayerWeekStore, week: int):
+        """Initialize a new FreeAgentPool instance."""
+        rows = free_agent_order(store, week)
+        self.rows: List[int] = rows.tolist()
+        self.eligible_slots = store.eligible_slots[rows]
+        self.candidates: Dict[str, List[int]] = {}
+        self.next_index: Dict[str, int] = {}
+        self.claimed = [False] * len(self.rows)
+        self._available = len(self.rows)
+
+    def __len__(self) -> int:
+        """Return the number of unclaimed free agents."""
+        return self._available
+
+    def claim(self, position: str) -> int:
+        """Claim the best available free agent for a position, returning their row."""
+        if position not in self.candidates:
+            self.candidates[position] = np.flatnonzero(
+                self.eligible_slots & slot_mask([position])
+            ).tolist()
+
+        candidates = self.candidates[position]
+        index = self.next_index.get(position, 0)
+        while index < len(candidates) and self.claimed[candidates[index]]:
+            index += 1
+
+        self.next_index[position] = index
+        if index == len(candidates):
+            raise IndexError(f"No free agents left for position: {position}")
+
+        self.claimed[candidates[index]] = True
+        self._available -= 1
+        self.next_index[position] = index + 1
+
+        return self.rows[candidates[index]]
+
+
+def replace_rows_with_free_agent(
+    store: PlayerWeekStore, lineup_rows: np.ndarray, free_agent_pool: FreeAgentPool
+) -> np.ndarray:
+    """Replace lineup rows with 0 points with free agent rows.
+
+    Each empty or 0 point slot claims the best available free agent for its
+    position from the pool, so later lineups skip them.
+    """
+    lineup_rows = lineup_rows.copy()
+    for slot, row in enumerate(lineup_rows.tolist()):
+        if row < 0 or store.points[row] == 0:
+            lineup_rows[slot] = free_agent_pool.claim(SLOT_POSITIONS[slot])
+
+    return lineup_rows
@@ -0,0 +1,173 @@
+"""Score many best ball leagues at once."""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from .fetch import DEFAULT_MAX_WORKERS
+from .response_cache import CachedLeague, ResponseCache
+from .results_store import ResultsStore
+from .rough_best_ball_score import get_best_ball_scores
+
+DEFAULT_MAX_LEAGUES = 4
+DEFAULT_REQUEST_TIMEOUT = 30.0
+
+
+@dataclass
+class LeagueReport:
+    """Scores, or the error, for a single league."""
+
+    league_id: int
+    year: int
+    seconds: float
+    scores: Optional[pd.DataFrame] = None
+    error: Optional[str] = None
+
+
+def score_league(
+    league_id: int,
+    year: int,
+    cache: ResponseCache,
+    results_path: Optional[Path] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    session: Optional[requests.Session] = None,
+    timeout: Optional[float] = None,
+    request_timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT,
+) -> LeagueReport:
+    """Score a league, reporting any error instead of raising it.
+
+    The league's requests go through ``session`` and each times out after
+    ``request_timeout`` seconds. Requests after ``timeout`` seconds raise
+    TimeoutError, so the league stops soon after its time is up.
+    """
+    start = time.perf_counter()
+    report = LeagueReport(league_id=league_id, year=year, seconds=0.0)
+    try:
+        league = CachedLeague(
+            league_id,
+            year,
+            cache,
+            session=session,
+            timeout=request_timeout,
+            deadline=None if timeout is None else time.monotonic() + timeout,
+        )
+        store = (
+            ResultsStore(results_path, league_id=league_id, year=year)
+            if results_path is not None
+            else None
+        )
+        report.scores = get_best_ball_scores(league, max_workers, store)
+    except Exception as error:
+        report.error = f"{type(error).__name__}: {error}"
+
+    report.seconds = time.perf_counter() - start
+
+    return report
+
+
+def score_leagues(
+    leagues: Sequence[Tuple[int, int]],
+    cache: ResponseCache,
+    results_path: Optional[Path] = None,
+    max_leagues: int = DEFAULT_MAX_LEAGUES,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timeout: Optional[float] = None,
+    request_timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT,
+) -> List[LeagueReport]:
+    """Score (league id, year) pairs concurrently with one session and cache.
+
+    Up to ``max_leagues`` leagues run at once, each fetching its weeks on
+    ``max_workers`` threads. A league that fails reports its error, and a league
+    whose requests are still going ``timeout`` seconds after it started reports
+    a TimeoutError, so no league holds up the rest or outlives the call.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=max_leagues * max_workers)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    with ThreadPoolExecutor(max_workers=max_leagues) as executor:
+        return list(
+            executor.map(
+                lambda league: score_league(
+                    *league,
+                    cache,
+                    results_path,
+                    max_workers,
+                    session,
+                    timeout,
+                    request_timeout,
+                ),
+                leagues,
+            )
+        )
+
+
+def combined_standings(reports: Sequence[LeagueReport]) -> pd.DataFrame:
+    """Rank every team by total points within its league and across leagues."""
+    frames = []
+    for report in reports:
+        if report.scores is None:
+            continue
+        frame = report.scores.rename_axis("team").reset_index()
+        frame.insert(0, "year", report.year)
+        frame.insert(0, "league_id", report.league_id)
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame(
+            columns=["league_id", "year", "team", "total", "league_rank", "rank"]
+        )
+
+    standings = pd.concat(frames, ignore_index=True)
+    week_columns = [column for column in standings if column.startswith("Week ")]
+    standings["total"] = standings[week_columns].sum(axis=1).round(2)
+    standings["league_rank"] = (
+        standings.groupby(["league_id", "year"])["total"]
+        .rank(ascending=False, method="min")
+        .astype(int)
+    )
+    standings["rank"] = (
+        standings["total"].rank(ascending=False, method="min").astype(int)
+    )
+
+    return standings.sort_values(by=["rank", "league_id"], ignore_index=True)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Score leagues and write the combined standings."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("league_ids", nargs="+", type=int)
+    parser.add_argument("--year", type=int, default=2022)
+    parser.add_argument("--standings", type=Path, default=Path("standings.csv"))
+    parser.add_argument("--max-leagues", type=int, default=DEFAULT_MAX_LEAGUES)
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument(
+        "--request-timeout", type=float, default=DEFAULT_REQUEST_TIMEOUT
+    )
+    args = parser.parse_args(argv)
+
+    reports = score_leagues(
+        [(league_id, args.year) for league_id in args.league_ids],
+        ResponseCache(Path("cache")),
+        results_path=Path("results"),
+        max_leagues=args.max_leagues,
+        timeout=args.timeout,
+        request_timeout=args.request_timeout,
+    )
+    combined_standings(reports).to_csv(args.standings, index=False)
+
+    for report in reports:
+        status = report.error or "ok"
+        print(f"{report.league_id} {report.year}: {status} ({report.seconds:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Compact player week store."""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from espn_api.football import BoxPlayer
+from espn_api.football.constant import POSITION_MAP
+
+from .batch_lineup import POSITIONS, best_ball_lineups
+
+# ESPN's lineup slot ids, so a slot is one bit of a player's eligible slots
+SLOT_IDS = {
+    name: slot_id
+    for slot_id, name in POSITION_MAP.items()
+    if isinstance(slot_id, int) and name
+}
+FREE_AGENT_TEAM = -1
+
+
+def slot_mask(eligible_slots: Iterable[str]) -> int:
+    """Pack eligible slot names into a bitmask of ESPN slot ids."""
+    mask = 0
+    for slot in eligible_slots:
+        if slot in SLOT_IDS:
+            mask |= 1 << SLOT_IDS[slot]
+
+    return mask
+
+
+POSITION_BITS = np.array([slot_mask([position]) for position in POSITIONS])
+
+
+@dataclass
+class PlayerWeekStore:
+    """Player weeks as parallel arrays, sorted by week then team.
+
+    A row is one player in one week, on a team's lineup or in the free agents
+    when ``teams`` is FREE_AGENT_TEAM. Rows of a team's week are contiguous and
+    keep the lineup order.
+    """
+
+    team_names: List[str]
+    player_ids: np.ndarray
+    points: np.ndarray
+    projected_points: np.ndarray
+    eligible_slots: np.ndarray
+    teams: np.ndarray
+    weeks: np.ndarray
+    _keys: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        """Sort the rows by week and team, keeping the order within each."""
+        order = np.lexsort((self.teams, self.weeks))
+        for name in ("player_ids", "points", "projected_points", "eligible_slots"):
+            setattr(self, name, getattr(self, name)[order])
+        self.teams = self.teams[order]
+        self.weeks = self.weeks[order]
+        self._keys = self._key(self.weeks, self.teams)
+
+    def __len__(self) -> int:
+        """Return the number of player weeks."""
+        return len(self.player_ids)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the bytes held by the arrays."""
+        return sum(
+            array.nbytes
+            for array in (
+                self.player_ids,
+                self.points,
+                self.projected_points,
+                self.eligible_slots,
+                self.teams,
+                self.weeks,
+                self._keys,
+            )
+        )
+
+    def _key(self, week, team):
+        """Combine weeks and teams into one sortable key."""
+        return np.asarray(week, dtype=np.int32) * (len(self.team_names) + 1) + (
+            np.asarray(team, dtype=np.int32) + 1
+        )
+
+    def rows(self, week: int, team: int = FREE_AGENT_TEAM) -> np.ndarray:
+        """Return the rows of a team's lineup, or the free agents, in a week."""
+        key = self._key(week, team)
+        start, stop = np.searchsorted(self._keys, [key, key + 1])
+
+        return np.arange(start, stop)
+
+    def eligible(self, rows: np.ndarray) -> np.ndarray:
+        """Return whether each row is eligible for each of POSITIONS."""
+        return (self.eligible_slots[rows, None] & POSITION_BITS) != 0
+
+
+def pack_player_weeks(
+    team_names: Sequence[str],
+    week_lineups: Dict[int, Dict[str, List[BoxPlayer]]],
+    week_free_agents: Optional[Dict[int, List[BoxPlayer]]] = None,
+) -> PlayerWeekStore:
+    """Pack lineups by week and team name, and any free agents, into a store."""
+    team_index = {name: index for index, name in enumerate(team_names)}
+    player_weeks = [
+        (week, team_index[name], player)
+        for week, lineups in week_lineups.items()
+        for name, lineup in lineups.items()
+        for player in lineup
+    ]
+    player_weeks.extend(
+        (week, FREE_AGENT_TEAM, player)
+        for week, free_agents in (week_free_agents or {}).items()
+        for player in free_agents
+    )
+
+    n_rows = len(player_weeks)
+    player_ids = np.empty(n_rows, dtype=np.int32)
+    points = np.empty(n_rows, dtype=np.float32)
+    projected_points = np.empty(n_rows, dtype=np.float32)
+    eligible_slots = np.empty(n_rows, dtype=np.uint32)
+    teams = np.empty(n_rows, dtype=np.int16)
+    weeks = np.empty(n_rows, dtype=np.int16)
+    for row, (week, team, player) in enumerate(player_weeks):
+        player_ids[row] = player.playerId
+        points[row] = player.points
+        projected_points[row] = player.projected_points
+        eligible_slots[row] = slot_mask(player.eligibleSlots)
+        teams[row] = team
+        weeks[row] = week
+
+    return PlayerWeekStore(
+        team_names=list(team_names),
+        player_ids=player_ids,
+        points=points,
+        projected_points=projected_points,
+        eligible_slots=eligible_slots,
+        teams=teams,
+        weeks=weeks,
+    )
+
+
+def concat_player_weeks(
+    team_names: Sequence[str], stores: Iterable[PlayerWeekStore]
+) -> PlayerWeekStore:
+    """Join stores of the same teams, like weeks packed one at a time."""
+    stores = list(stores)
+    arrays = {
+        name: np.concatenate(
+            [np.empty(0, dtype=dtype)] + [getattr(store, name) for store in stores]
+        )
+        for name, dtype in (
+            ("player_ids", np.int32),
+            ("points", np.float32),
+            ("projected_points", np.float32),
+            ("eligible_slots", np.uint32),
+            ("teams", np.int16),
+            ("weeks", np.int16),
+        )
+    }
+
+    return PlayerWeekStore(team_names=list(team_names), **arrays)
+
+
+def create_ideal_lineup_rows(store: PlayerWeekStore, rows: np.ndarray) -> np.ndarray:
+    """Create an ideal lineup from store rows.
+
+    Picks the same players as ``best_ball_lineups`` and returns their rows for
+    each of LINEUP_SLOTS, with -1 where the lineup cannot fill the slot.
+    """
+    slot_index, _ = best_ball_lineups(store.points[rows], store.eligible(rows))
+
+    return np.where(slot_index >= 0, rows[np.maximum(slot_index, 0)], -1)
+
+
+def ideal_lineup_rows(store: PlayerWeekStore) -> Tuple[np.ndarray, np.ndarray]:
+    """Create the ideal lineup of every team's week at once.
+
+    Returns the weeks with lineups, and the row for each of LINEUP_SLOTS with
+    shape (team x week x slot), -1 where the lineup cannot fill the slot.
+    """
+    lineup = np.flatnonzero(store.teams != FREE_AGENT_TEAM)
+    weeks, week_index = np.unique(store.weeks[lineup], return_inverse=True)
+    keys = store._keys[lineup]
+    position = lineup - lineup[np.searchsorted(keys, keys)]
+
+    index = np.full(
+        (len(store.team_names), len(weeks), position.max(initial=-1) + 1), -1
+    )
+    index[store.teams[lineup], week_index, position] = lineup
+    padding = index < 0
+    points = np.where(padding, 0, store.points[index])
+    eligible = store.eligible(index) & ~padding[..., None]
+
+    slot_index, _ = best_ball_lineups(points, eligible)
+    rows = np.where(
+        slot_index >= 0,
+        np.take_along_axis(index, np.maximum(slot_index, 0), axis=-1),
+        -1,
+    )
+
+    return weeks, rows
+
+
+def free_agent_order(store: PlayerWeekStore, week: int) -> np.ndarray:
+    """Return the week's scoring free agent rows by descending projected points.
+
+    Ties go to the free agent listed last, the same order as reversing a sort on
+    projected points.
+    """
+    rows = store.rows(week)
+    rows = rows[store.points[rows] > 0]
+
+    return rows[::-1][np.argsort(-store.projected_points[rows[::-1]], kind="stable")]
@@ -0,0 +1,245 @@
+"""Cache ESPN league responses on disk."""
+
+import hashlib
+import math
+import os
+import pickle
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Union
+
+import requests
+from espn_api.football import BoxPlayer, League
+from espn_api.football.box_score import BoxScore
+
+from ..instrumentation import span
+from .espn_session import SessionRequests, session_espn_requests
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_CURRENT_WEEK_TTL = 15 * 60
+# Evicting below max_bytes leaves room for many writes before the next scan
+EVICT_TO_FRACTION = 0.9
+
+_HEADER = struct.Struct("<d")
+
+
+class ResponseCache:
+    """Size bounded LRU cache of compressed, pickled responses on disk.
+
+    Each entry starts with its expiry time, infinite for entries that never
+    expire. When the cache grows past ``max_bytes`` expired entries are removed
+    first, then the least recently used. The size is counted once and then kept
+    up to date as entries are written, so only a write that takes the cache
+    past ``max_bytes`` scans the entries, evicting down to EVICT_TO_FRACTION of
+    it.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES):
+        """Initialize a new ResponseCache instance."""
+        self.folder = Path(path)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def get_or_fetch(
+        self, key: str, fetch: Callable[[], Any], ttl: Optional[float] = None
+    ) -> Any:
+        """Return the cached value for key, fetching and storing it on a miss.
+
+        A ``ttl`` of None stores the value until it is evicted.
+        """
+        file = self._key_file(key)
+        with span("response_cache.get") as cache_span:
+            try:
+                with open(file, "rb") as f:
+                    (expires_at,) = _HEADER.unpack(f.read(_HEADER.size))
+                    if expires_at > time.time():
+                        data = f.read()
+                        value = pickle.loads(zlib.decompress(data))
+                        os.utime(file)
+                        cache_span.add(hits=1, bytes=len(data))
+                        return value
+            # Truncated entries, and pickles of classes that have since moved or
+            # changed, e.g. after an espn_api upgrade, are misses
+            except (
+                FileNotFoundError,
+                EOFError,
+                struct.error,
+                zlib.error,
+                pickle.UnpicklingError,
+                AttributeError,
+                ImportError,
+            ):
+                pass
+
+            cache_span.add(misses=1)
+
+        value = fetch()
+        total_bytes = self._write(
+            file, value, math.inf if ttl is None else time.time() + ttl
+        )
+        if total_bytes > self.max_bytes:
+            self.evict(int(self.max_bytes * EVICT_TO_FRACTION))
+
+        return value
+
+    def evict(self, target_bytes: Optional[int] = None):
+        """Evict entries until the cache fits in target_bytes, or max_bytes."""
+        if target_bytes is None:
+            target_bytes = self.max_bytes
+
+        with self._lock:
+            entries = []
+            for file in self.folder.glob("*.cache"):
+                try:
+                    stat = file.stat()
+                    with open(file, "rb") as f:
+                        (expires_at,) = _HEADER.unpack(f.read(_HEADER.size))
+                except (FileNotFoundError, struct.error):
+                    continue
+                is_live = expires_at > time.time()
+                entries.append((is_live, stat.st_mtime, stat.st_size, file))
+
+            total_bytes = sum(size for _, _, size, _ in entries)
+            for _, _, size, file in sorted(entries):
+                if total_bytes <= target_bytes:
+                    break
+                file.unlink(missing_ok=True)
+                total_bytes -= size
+
+            self._total_bytes = total_bytes
+
+    def clear(self):
+        """Remove every entry."""
+        with self._lock:
+            for file in self.folder.glob("*.cache"):
+                file.unlink(missing_ok=True)
+
+            self._total_bytes = 0
+
+    def _write(self, file: Path, value: Any, expires_at: float) -> int:
+        """Write an entry atomically, returning the cache's new size in bytes."""
+        self.folder.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(expires_at))
+            f.write(zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL)))
+            size = f.tell()
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._size()
+            try:
+                replaced_size = file.stat().st_size
+            except FileNotFoundError:
+                replaced_size = 0
+
+            os.replace(tmp_name, file)
+            self._total_bytes += size - replaced_size
+
+            return self._total_bytes
+
+    def _size(self) -> int:
+        """Return the bytes held by every entry."""
+        total_bytes = 0
+        for file in self.folder.glob("*.cache"):
+            try:
+                total_bytes += file.stat().st_size
+            except FileNotFoundError:
+                continue
+
+        return total_bytes
+
+    def _key_file(self, key: str) -> Path:
+        """Return the file for a key."""
+        return self.folder / f"{hashlib.sha1(key.encode()).hexdigest()}.cache"
+
+
+class CachedLeague:
+    """League whose ESPN calls are served from a ResponseCache.
+
+    Weeks before the league's current week are final and cached until evicted,
+    while the league itself and the current week expire after
+    ``current_week_ttl`` seconds. Given a ``session``, ``timeout`` or
+    ``deadline``, the league's own requests go through a SessionRequests with
+    them, without touching other leagues.
+    """
+
+    def __init__(
+        self,
+        league_id: int,
+        year: int,
+        cache: ResponseCache,
+        current_week_ttl: float = DEFAULT_CURRENT_WEEK_TTL,
+        session: Optional[requests.Session] = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        **league_kwargs,
+    ):
+        """Initialize a new CachedLeague instance."""
+        self.cache = cache
+        self.current_week_ttl = current_week_ttl
+        self.session_requests = None
+        if session is not None or timeout is not None or deadline is not None:
+            self.session_requests = SessionRequests(session, timeout, deadline)
+
+        self.league: League = cache.get_or_fetch(
+            f"{league_id}/{year}/league",
+            lambda: self._fetch_league(league_id, year, **league_kwargs),
+            ttl=current_week_ttl,
+        )
+        if self.session_requests is not None:
+            self.league.espn_request = session_espn_requests(
+                self.league.espn_request, self.session_requests
+            )
+
+    def __getattr__(self, name: str) -> Any:
+        """Fall back to the wrapped league."""
+        if name == "league":
+            raise AttributeError(name)
+        return getattr(self.league, name)
+
+    def _fetch_league(self, league_id: int, year: int, **league_kwargs) -> League:
+        """Fetch the league, caching it without the session."""
+        if self.session_requests is None:
+            return League(league_id=league_id, year=year, **league_kwargs)
+
+        league = League(
+            league_id=league_id, year=year, fetch_league=False, **league_kwargs
+        )
+        espn_request = league.espn_request
+        league.espn_request = session_espn_requests(espn_request, self.session_requests)
+        league.fetch_league()
+        league.espn_request = espn_request
+
+        return league
+
+    def box_scores(self, week: int) -> List[BoxScore]:
+        """Get the box scores for a week."""
+        return self.cache.get_or_fetch(
+            self._week_key("box_scores", week),
+            lambda: self.league.box_scores(week),
+            ttl=self._week_ttl(week),
+        )
+
+    def free_agents(self, week: Optional[int] = None, **kwargs) -> List[BoxPlayer]:
+        """Get the free agents for a week."""
+        week = week or self.league.current_week
+        return self.cache.get_or_fetch(
+            self._week_key("free_agents", week, **kwargs),
+            lambda: self.league.free_agents(week=week, **kwargs),
+            ttl=self._week_ttl(week),
+        )
+
+    def _week_key(self, call: str, week: int, **kwargs) -> str:
+        """Return the cache key for a call in a week."""
+        options = ",".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+        return f"{self.league.league_id}/{self.league.year}/{call}/{week}/{options}"
+
+    def _week_ttl(self, week: int) -> Optional[float]:
+        """Return the ttl for a week, None once the week is final."""
+        return None if week < self.league.current_week else self.current_week_ttl
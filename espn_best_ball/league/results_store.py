@@ -0,0 +1,58 @@
+"""Store best ball results."""
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Union
+
+
+@dataclass
+class WeekResult:
+    """Best ball result for a single finalized week."""
+
+    week: int
+    scores: Dict[str, float]
+    free_agents: Dict[str, List[int]]
+    waiver_order: List[str]
+
+
+class ResultsStore:
+    """Per-week results saved as json files under league id and year."""
+
+    def __init__(self, path: Union[str, Path], league_id: int, year: int):
+        """Initialize a new ResultsStore instance."""
+        self.folder = Path(path) / str(league_id) / str(year)
+
+    def weeks(self) -> List[int]:
+        """Return the contiguous weeks stored, starting from week 1."""
+        stored = {
+            int(file.stem.split("_")[1]) for file in self.folder.glob("week_*.json")
+        }
+
+        weeks = []
+        while len(weeks) + 1 in stored:
+            weeks.append(len(weeks) + 1)
+
+        return weeks
+
+    def load(self, week: int) -> WeekResult:
+        """Load the result for a week."""
+        with open(self._week_file(week)) as f:
+            return WeekResult(**json.load(f))
+
+    def load_all(self) -> List[WeekResult]:
+        """Load the results for every contiguous stored week."""
+        return [self.load(week) for week in self.weeks()]
+
+    def save(self, result: WeekResult):
+        """Save the result for a week, replacing any stored result."""
+        self.folder.mkdir(parents=True, exist_ok=True)
+        tmp_file = self._week_file(result.week).with_suffix(".tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(asdict(result), f, indent=2)
+
+        tmp_file.replace(self._week_file(result.week))
+
+    def _week_file(self, week: int) -> Path:
+        """Return the file for a week."""
+        return self.folder / f"week_{week}.json"
@@ -1,144 +1,191 @@
 """Rough best ball score."""
 
-from dataclasses import dataclass, field, fields
-from typing import List
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
 
+import numpy as np
 import pandas as pd
 from espn_api.football import BoxPlayer, League, Team
+from espn_api.football.box_score import BoxScore
 
+from ..instrumentation import span
+from .fetch import DEFAULT_MAX_WORKERS, WeekData, iter_weeks
+from .free_agent_pool import FreeAgentPool, replace_rows_with_free_agent
+from .player_store import (
+    PlayerWeekStore,
+    concat_player_weeks,
+    ideal_lineup_rows,
+    pack_player_weeks,
+)
+from .response_cache import CachedLeague, ResponseCache
+from .results_store import ResultsStore, WeekResult
 
-@dataclass
-class IdealLineup:
-    """Ideal best ball lineup."""
-
-    qb: BoxPlayer = field(metadata={"position": "QB"})
-    wr1: BoxPlayer = field(metadata={"position": "WR"})
-    wr2: BoxPlayer = field(metadata={"position": "WR"})
-    rb1: BoxPlayer = field(metadata={"position": "RB"})
-    rb2: BoxPlayer = field(metadata={"position": "RB"})
-    te: BoxPlayer = field(metadata={"position": "TE"})
-    flex: BoxPlayer = field(metadata={"position": "RB/WR/TE"})
-
-    def total_points(self):
-        """Sum up all the points."""
-        return round(
-            self.qb.points
-            + self.wr1.points
-            + self.wr2.points
-            + self.rb1.points
-            + self.rb2.points
-            + self.te.points
-            + self.flex.points,
-            2,
-        )
 
+def lineup_total_points(lineup_points: np.ndarray) -> float:
+    """Sum up all the points in a batch lineup."""
+    return round(float(lineup_points.sum(dtype=np.float64)), 2)
 
-def player_with_max_points(list_of_players: List[BoxPlayer]) -> BoxPlayer:
-    """Find player with max points in a list."""
-    return list_of_players.pop(
-        list_of_players.index(max(list_of_players, key=lambda x: x.points))
-    )
+
+class SeasonTotals:
+    """Running season point totals per team."""
+
+    def __init__(self, team_names: List[str]):
+        """Initialize a new SeasonTotals instance."""
+        self.team_names = team_names
+        self.team_index = {name: i for i, name in enumerate(team_names)}
+        self.totals = np.zeros(len(team_names))
+
+    def add_week(self, scores: Dict[str, float]):
+        """Add a week of scores to the totals."""
+        week_scores = np.zeros(len(self.team_names))
+        for name, score in scores.items():
+            week_scores[self.team_index[name]] = score
+
+        self.totals += week_scores
+
+    def waiver_order(self) -> List[str]:
+        """Return team names from lowest to highest total points."""
+        return [self.team_names[i] for i in np.argsort(self.totals, kind="stable")]
 
 
-def index_of_first_player_in_position(
-    list_of_players: List[BoxPlayer], position: str
-) -> int:
-    """Return the index of the first player matching position."""
-    return list_of_players.index(
-        [x for x in list_of_players if position in x.eligibleSlots][0]
+def _team_lineups(box_scores: List[BoxScore]) -> Dict[str, List[BoxPlayer]]:
+    """Map team names to their lineups in the week's box scores."""
+    teams = {}
+    for box_score in box_scores:
+        if box_score.home_team != 0:
+            teams[box_score.home_team.team_name] = box_score.home_lineup
+
+        if box_score.away_team != 0:
+            teams[box_score.away_team.team_name] = box_score.away_lineup  # type: ignore
+
+    return teams
+
+
+def pack_week_data(teams: List[Team], week_data: List[WeekData]) -> PlayerWeekStore:
+    """Pack prefetched weeks' lineups and free agents into a player week store."""
+    return pack_player_weeks(
+        [team.team_name for team in teams],
+        {data.week: _team_lineups(data.box_scores) for data in week_data},
+        {data.week: data.free_agents for data in week_data},
     )
 
 
-def create_ideal_lineup(lineup: List[BoxPlayer]) -> IdealLineup:
-    """Create an ideal lineup."""
-    qbs = []
-    rbs = []
-    wrs = []
-    tes = []
-    for player in lineup:
-        if "QB" in player.eligibleSlots:
-            qbs.append(player)
-        elif "RB" in player.eligibleSlots:
-            rbs.append(player)
-        elif "WR" in player.eligibleSlots:
-            wrs.append(player)
-        elif "TE" in player.eligibleSlots:
-            tes.append(player)
-        else:
-            print(player, "does not match any eligible roles")
-
-    return IdealLineup(
-        qb=player_with_max_points(qbs),
-        wr1=player_with_max_points(wrs),
-        wr2=player_with_max_points(wrs),
-        rb1=player_with_max_points(rbs),
-        rb2=player_with_max_points(rbs),
-        te=player_with_max_points(tes),
-        flex=player_with_max_points(rbs + wrs + tes),
+def fetch_week_store(
+    league: Union[League, CachedLeague],
+    weeks: Sequence[int],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> PlayerWeekStore:
+    """Fetch weeks into a player week store, packing each week as it arrives."""
+    return concat_player_weeks(
+        [team.team_name for team in league.teams],
+        (
+            pack_week_data(league.teams, [data])
+            for data in iter_weeks(league, weeks, max_workers)
+        ),
     )
 
 
-def replace_with_free_agent(
-    ideal_lineup: IdealLineup, free_agent_list: List[BoxPlayer]
-) -> IdealLineup:
-    """Replace players with 0 points in lineup with free agents."""
-    for dataclass_field in fields(ideal_lineup):
-        if getattr(ideal_lineup, dataclass_field.name).points == 0:
-            free_agent = free_agent_list.pop(
-                index_of_first_player_in_position(
-                    free_agent_list, dataclass_field.metadata["position"]
-                )
+def score_store_results(
+    store: PlayerWeekStore, previous_results: Sequence[WeekResult] = ()
+) -> List[WeekResult]:
+    """Score a store's weeks following on from any previous results.
+
+    Every ideal lineup is picked in one batch, then each week's free agent pool
+    streams into 0 point slots in waiver order. The waiver order starts from the
+    store's teams, or from the end of the last previous result when there is one.
+    """
+    weeks, lineup_rows = ideal_lineup_rows(store)
+    team_index = {name: i for i, name in enumerate(store.team_names)}
+
+    waiver_order = list(store.team_names)
+    if previous_results:
+        waiver_order = list(previous_results[-1].waiver_order)
+
+    season_totals = SeasonTotals(
+        list(previous_results[0].scores) if previous_results else waiver_order
+    )
+    for result in previous_results:
+        season_totals.add_week(result.scores)
+
+    results = []
+    for week_index, week in enumerate(weeks):
+        scores = {}
+        free_agents_used = {}
+
+        free_agent_pool = FreeAgentPool(store, week)
+        for name in waiver_order:
+            rows = lineup_rows[team_index[name], week_index]
+            new_rows = replace_rows_with_free_agent(store, rows, free_agent_pool)
+
+            scores[name] = lineup_total_points(store.points[new_rows])
+            free_agents_used[name] = store.player_ids[
+                new_rows[new_rows != rows]
+            ].tolist()
+
+        season_totals.add_week(scores)
+        waiver_order = season_totals.waiver_order()
+
+        results.append(
+            WeekResult(
+                week=int(week),
+                scores=scores,
+                free_agents=free_agents_used,
+                waiver_order=waiver_order,
             )
-            setattr(ideal_lineup, dataclass_field.name, free_agent)
-
-    return ideal_lineup
-
-
-def get_best_ball_scores(league: League) -> pd.DataFrame:
-    """Get best ball scores for weeks so far."""
-    out = {}
-    waiver_order: List[Team] = league.teams
-    for week in range(1, league.current_week):
-        out[f"Week {week}"] = {}
-
-        box_scores = league.box_scores(week)
-        teams = {}
-        for box_score in box_scores:
-            if box_score.home_team != 0:
-                teams[box_score.home_team.team_name] = box_score.home_lineup
-
-            if box_score.away_team != 0:
-                teams[
-                    box_score.away_team.team_name  # type: ignore
-                ] = box_score.away_lineup
-
-        free_agents: List[BoxPlayer] = sorted(
-            [
-                x
-                for x in league.free_agents(week=week)
-                if x.points > 0.0  # type: ignore
-            ],
-            key=lambda x: x.projected_points,  # type: ignore
-        )[::-1]
-
-        for team in waiver_order:
-            ideal_lineup = create_ideal_lineup(teams[team.team_name])
-            ideal_lineup_w_fa = replace_with_free_agent(ideal_lineup, free_agents)
-
-            out[f"Week {week}"][team.team_name] = ideal_lineup_w_fa.total_points()
-
-        total_score_order = list(pd.DataFrame(out).sum(axis=1).sort_values().index)
-        waiver_order = sorted(
-            waiver_order, key=lambda x: total_score_order.index(x.team_name)
         )
 
-    return pd.DataFrame(out)
+    return results
+
+
+def results_to_frame(results: Sequence[WeekResult]) -> pd.DataFrame:
+    """Convert week results to the best ball scores frame."""
+    return pd.DataFrame({f"Week {result.week}": result.scores for result in results})
+
+
+def get_best_ball_scores(
+    league: Union[League, CachedLeague],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    store: Optional[ResultsStore] = None,
+    last_week: Optional[int] = None,
+) -> pd.DataFrame:
+    """Get best ball scores for weeks so far, or up to and including last_week.
+
+    With a store, only weeks missing from it are fetched and scored, and the
+    newly finalized weeks are saved back to it.
+    """
+    if last_week is not None and last_week < 1:
+        raise ValueError(f"last_week must be at least 1, received: {last_week}")
+
+    end_week = league.current_week
+    if last_week is not None:
+        end_week = min(end_week, last_week + 1)
+
+    with span("score.load_results"):
+        previous_results = store.load_all() if store is not None else []
+    previous_results = previous_results[: end_week - 1]
+    first_week = len(previous_results) + 1
+
+    with span("score.fetch_weeks") as fetch_span:
+        week_store = fetch_week_store(league, range(first_week, end_week), max_workers)
+        fetch_span.add(rows=len(week_store), bytes=week_store.nbytes)
+
+    with span("score.score_weeks"):
+        results = score_store_results(week_store, previous_results)
+
+    if store is not None:
+        with span("score.save_results"):
+            for result in results:
+                store.save(result)
+
+    return results_to_frame([*previous_results, *results])
 
 
 def main():
     """Run main function."""
-    league = League(league_id=1030704919, year=2022)
-    get_best_ball_scores(league).to_csv("hackathon_points.csv")
+    league_id, year = 1030704919, 2022
+    league = CachedLeague(league_id, year, ResponseCache(Path("cache")))
+    store = ResultsStore(Path("results"), league_id=league_id, year=year)
+    get_best_ball_scores(league, store=store).to_csv("hackathon_points.csv")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,141 @@
+"""Simulate best ball seasons."""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from espn_api.football import Team
+
+from .batch_lineup import POSITIONS, best_ball_totals, eligible_positions
+
+DEFAULT_WEEKS = 17
+DEFAULT_SD_RATIO = 0.5
+DEFAULT_MISS_RATE = 0.1
+DEFAULT_SEASONS_PER_TASK = 2_000
+
+
+@dataclass
+class SeasonRosters:
+    """Rosters packed for simulation."""
+
+    team_names: List[str]
+    projected_points: np.ndarray
+    eligible: np.ndarray
+
+
+def pack_season_rosters(teams: List[Team], weeks: int = DEFAULT_WEEKS) -> SeasonRosters:
+    """Pack each team's roster with weekly projected points and position masks."""
+    n_players = max((len(team.roster) for team in teams), default=0)
+    projected_points = np.zeros((len(teams), n_players), dtype=np.float32)
+    eligible = np.zeros((len(teams), n_players, len(POSITIONS)), dtype=bool)
+    for team_index, team in enumerate(teams):
+        for index, player in enumerate(team.roster):
+            projected_points[team_index, index] = (
+                player.projected_avg_points or player.projected_total_points / weeks
+            )
+            eligible[team_index, index] = eligible_positions(player)
+
+    return SeasonRosters(
+        team_names=[team.team_name for team in teams],
+        projected_points=projected_points,
+        eligible=eligible,
+    )
+
+
+def simulate_season_totals(
+    rosters: SeasonRosters,
+    n_seasons: int,
+    rng: np.random.Generator,
+    weeks: int = DEFAULT_WEEKS,
+    sd_ratio: float = DEFAULT_SD_RATIO,
+    miss_rate: float = DEFAULT_MISS_RATE,
+) -> np.ndarray:
+    """Simulate best ball season totals with shape (season x team).
+
+    Weekly points are drawn from a normal distribution around the projection,
+    floored at 0, and a player misses a week with probability ``miss_rate``.
+    Zero-point slots are not streamed with free agents.
+    """
+    means = rosters.projected_points
+    shape = (n_seasons, weeks) + means.shape
+    points = rng.standard_normal(shape, dtype=np.float32)
+    points *= means * sd_ratio
+    points += means
+    np.maximum(points, 0, out=points)
+    points[rng.random(shape, dtype=np.float32) < miss_rate] = 0
+
+    return best_ball_totals(points, rosters.eligible).sum(axis=1)
+
+
+def finish_position_counts(totals: np.ndarray) -> np.ndarray:
+    """Count each team's finishes with shape (team x finish position)."""
+    n_teams = totals.shape[1]
+    finish = np.argsort(np.argsort(-totals, axis=1, kind="stable"), axis=1)
+    team = np.broadcast_to(np.arange(n_teams), finish.shape)
+
+    return np.bincount(
+        (team * n_teams + finish).ravel(), minlength=n_teams * n_teams
+    ).reshape(n_teams, n_teams)
+
+
+def finish_position_probabilities(
+    rosters: SeasonRosters,
+    n_seasons: int = 100_000,
+    weeks: int = DEFAULT_WEEKS,
+    sd_ratio: float = DEFAULT_SD_RATIO,
+    miss_rate: float = DEFAULT_MISS_RATE,
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    seasons_per_task: int = DEFAULT_SEASONS_PER_TASK,
+) -> pd.DataFrame:
+    """Simulate seasons and return each team's probability of each finish.
+
+    Seasons are split into tasks of ``seasons_per_task`` that run on a process
+    pool, each with its own random stream spawned from ``seed``.
+    """
+    task_sizes = [seasons_per_task] * (n_seasons // seasons_per_task)
+    if n_seasons % seasons_per_task:
+        task_sizes.append(n_seasons % seasons_per_task)
+    seeds = np.random.SeedSequence(seed).spawn(len(task_sizes))
+
+    args = [
+        (rosters, task_size, task_seed, weeks, sd_ratio, miss_rate)
+        for task_size, task_seed in zip(task_sizes, seeds)
+    ]
+    if max_workers == 1:
+        task_counts = [_simulate_finish_counts(*task_args) for task_args in args]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            task_counts = list(executor.map(_simulate_finish_counts, *zip(*args)))
+
+    n_teams = len(rosters.team_names)
+    counts = sum(task_counts, np.zeros((n_teams, n_teams), dtype=np.int64))
+
+    return pd.DataFrame(
+        counts / max(n_seasons, 1),
+        index=pd.Index(rosters.team_names, name="team"),
+        columns=pd.Index(range(1, n_teams + 1), name="finish"),
+    )
+
+
+def _simulate_finish_counts(
+    rosters: SeasonRosters,
+    n_seasons: int,
+    seed: np.random.SeedSequence,
+    weeks: int,
+    sd_ratio: float,
+    miss_rate: float,
+) -> np.ndarray:
+    """Simulate a batch of seasons and count the finishes."""
+    totals = simulate_season_totals(
+        rosters,
+        n_seasons,
+        np.random.default_rng(seed),
+        weeks=weeks,
+        sd_ratio=sd_ratio,
+        miss_rate=miss_rate,
+    )
+
+    return finish_position_counts(totals)
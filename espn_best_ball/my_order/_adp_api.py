@@ -1,25 +1,96 @@
 """ADP API."""
-from typing import Mapping, Sequence, Union
+
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
 import requests
-from requests import Response
+from requests.adapters import HTTPAdapter
+
+from ..instrumentation import span
 
 JsonLike = Union[Mapping, Sequence]
 
+DEFAULT_API_URL = "https://fantasyfootballcalculator.com/api/v1/adp"
+DEFAULT_MAX_WORKERS = 4
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def shared_session() -> requests.Session:
+    """Return the session shared by every ADPRestApi without its own."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=DEFAULT_MAX_WORKERS * 4)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+
+    return _session
+
 
 # ADP Rest API
 class ADPRestApi:
     """Get the ADP values from drafts done on fantasyfootballcalculator.com."""
 
     def __init__(
-        self, scoring_format="ppr", year=2022, number_of_teams=12, position="all"
+        self,
+        scoring_format="ppr",
+        year=2022,
+        number_of_teams=12,
+        position="all",
+        cache_dir: Optional[Union[str, Path]] = None,
+        session: Optional[requests.Session] = None,
+        api_url: str = DEFAULT_API_URL,
     ):
-        """Initialize a new ADPRestApi instance."""
-        self.api_url = "https://fantasyfootballcalculator.com/api/v1/adp"
+        """Initialize a new ADPRestApi instance.
+
+        Responses are cached in ``cache_dir`` when given and revalidated with the
+        server before reuse. Requests go through ``session``, or a session shared
+        by every instance so connections are pooled.
+        """
+        self.api_url = api_url
         self.scoring_format = self._get_valid_scoring_format(scoring_format)
         self.year = year
         self.number_of_teams = number_of_teams
         self.position = self._get_valid_position(position)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.session = session
+
+    @classmethod
+    def get_many(
+        cls,
+        configurations: Iterable[Tuple[str, int, int, str]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        remove_bad_data: bool = True,
+        **kwargs,
+    ) -> List[JsonLike]:
+        """Get ADP for many (scoring_format, year, number_of_teams, position).
+
+        The calls run concurrently on a bounded thread pool and the results come
+        back in the order of ``configurations``. With ``remove_bad_data`` off the
+        full responses are returned. Extra keyword arguments are passed to every
+        instance.
+        """
+        clients = [
+            cls(scoring_format, year, number_of_teams, position, **kwargs)
+            for scoring_format, year, number_of_teams, position in configurations
+        ]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(
+                executor.map(
+                    lambda client: (
+                        client.get() if remove_bad_data else client.get_response()
+                    ),
+                    clients,
+                )
+            )
 
     def get(self) -> JsonLike:
         """Get call to ADP Rest API."""
@@ -27,22 +98,85 @@ class ADPRestApi:
 
         return self._remove_bad_data(api_response)
 
-    def _get(self) -> Response:
-        """Call API with get request."""
-        return requests.request(
-            method="GET",
-            url=(
-                f"{self.api_url}"
-                f"/{self.scoring_format}"
-                f"?year={self.year}"
-                f"&teams={self.number_of_teams}"
-                f"&position={self.position}"
-            ),
+    def get_response(self) -> Mapping:
+        """Get call to ADP Rest API, keeping every player and the meta data."""
+        return self._get()
+
+    def _get(self) -> Mapping:
+        """Call API with get request, revalidating any cached response."""
+        cached = self._load_cached()
+        headers = {}
+        if cached is not None and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached is not None and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        with span("adp.get") as get_span:
+            response = (self.session or shared_session()).request(
+                method="GET",
+                url=f"{self.api_url}/{self.scoring_format}",
+                params={
+                    "year": self.year,
+                    "teams": self.number_of_teams,
+                    "position": self.position,
+                },
+                headers=headers,
+            )
+            get_span.add(
+                bytes=len(response.content),
+                not_modified=int(response.status_code == 304),
+            )
+
+        if cached is not None and response.status_code == 304:
+            return cached["body"]
+
+        response.raise_for_status()
+        response_json = response.json()
+        self._save_cached(
+            {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "body": response_json,
+            }
+        )
+
+        return response_json
+
+    def _load_cached(self) -> Optional[Mapping]:
+        """Load the cached response, if there is one."""
+        if self.cache_dir is None:
+            return None
+
+        try:
+            with open(self._cache_file) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _save_cached(self, cached: Mapping):
+        """Save a response to the cache."""
+        if self.cache_dir is None:
+            return
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(cached, f)
+
+        os.replace(tmp_name, self._cache_file)
+
+    @property
+    def _cache_file(self) -> Path:
+        """Return the cache file for this configuration."""
+        return self.cache_dir / (
+            f"{self.scoring_format}_{self.year}"
+            f"_{self.number_of_teams}_{self.position}.json"
         )
 
-    def _remove_bad_data(self, response: Response, min_percentage: int = 1) -> JsonLike:
+    def _remove_bad_data(
+        self, response_json: Mapping, min_percentage: int = 1
+    ) -> JsonLike:
         """Remove the bad data from the response."""
-        response_json: Mapping = response.json()
         total_drafts: int = response_json["meta"]["total_drafts"]
         min_value = total_drafts * (min_percentage / 100)
 
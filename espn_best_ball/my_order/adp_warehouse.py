@@ -0,0 +1,115 @@
+"""Historical ADP warehouse."""
+
+from itertools import product
+from pathlib import Path
+from typing import Iterable, Optional, Sequence, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from ._adp_api import DEFAULT_MAX_WORKERS, ADPRestApi
+
+PARTITIONING = ds.partitioning(
+    pa.schema(
+        [
+            ("scoring_format", pa.string()),
+            ("year", pa.int64()),
+            ("number_of_teams", pa.int64()),
+        ]
+    ),
+    flavor="hive",
+)
+
+
+def ingest_adp(
+    path: Union[str, Path],
+    scoring_formats: Iterable[str],
+    years: Iterable[int],
+    team_counts: Iterable[int],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    **kwargs,
+) -> pd.DataFrame:
+    """Fetch ADP for every combination and write it to a Parquet dataset.
+
+    The dataset is partitioned by scoring format, year and number of teams, and
+    ingested partitions replace what was there. Every player is kept along with
+    the number of drafts, so queries can apply their own bad data cutoff. Extra
+    keyword arguments are passed to every ADPRestApi.
+    """
+    configurations = [
+        (ADPRestApi(scoring_format).scoring_format, year, number_of_teams, "all")
+        for scoring_format, year, number_of_teams in product(
+            scoring_formats, years, team_counts
+        )
+    ]
+    responses = ADPRestApi.get_many(
+        configurations, max_workers=max_workers, remove_bad_data=False, **kwargs
+    )
+
+    frames = []
+    for (scoring_format, year, number_of_teams, _), response in zip(
+        configurations, responses
+    ):
+        frame = pd.DataFrame(response["players"])
+        frame["total_drafts"] = response["meta"]["total_drafts"]
+        frame["scoring_format"] = scoring_format
+        frame["year"] = year
+        frame["number_of_teams"] = number_of_teams
+        frames.append(frame)
+
+    adp = pd.concat(frames, ignore_index=True)
+    ds.write_dataset(
+        pa.Table.from_pandas(adp, preserve_index=False),
+        Path(path),
+        format="parquet",
+        partitioning=PARTITIONING,
+        existing_data_behavior="delete_matching",
+    )
+
+    return adp
+
+
+def load_adp(
+    path: Union[str, Path],
+    columns: Optional[Sequence[str]] = None,
+    scoring_formats: Optional[Iterable[str]] = None,
+    years: Optional[Iterable[int]] = None,
+    team_counts: Optional[Iterable[int]] = None,
+    positions: Optional[Iterable[str]] = None,
+    min_percentage: Optional[float] = 1,
+) -> pd.DataFrame:
+    """Load a slice of the ADP dataset.
+
+    Only ``columns`` are read, and the filters are pushed down to the dataset so
+    partitions and row groups that cannot match are skipped. ``min_percentage``
+    drops players drafted in too few drafts, the same as ADPRestApi.get.
+    """
+    dataset = ds.dataset(Path(path), format="parquet", partitioning=PARTITIONING)
+
+    filters = []
+    if scoring_formats is not None:
+        filters.append(ds.field("scoring_format").isin(list(scoring_formats)))
+    if years is not None:
+        filters.append(ds.field("year").isin(list(years)))
+    if team_counts is not None:
+        filters.append(ds.field("number_of_teams").isin(list(team_counts)))
+    if positions is not None:
+        filters.append(ds.field("position").isin(list(positions)))
+    if min_percentage is not None:
+        filters.append(
+            ds.field("times_drafted")
+            > ds.field("total_drafts") * (min_percentage / 100)
+        )
+
+    expression = None
+    for expression_filter in filters:
+        expression = (
+            expression_filter if expression is None else expression & expression_filter
+        )
+
+    table = dataset.to_table(
+        columns=list(columns) if columns is not None else None, filter=expression
+    )
+
+    return table.to_pandas()
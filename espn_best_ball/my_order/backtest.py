@@ -0,0 +1,285 @@
+"""Backtest the draft ranking on past seasons."""
+
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow.dataset as ds
+
+from ..draft.draft_simulator import (
+    DEFAULT_ROUNDS,
+    POSITION_LIMITS,
+    POSITIONS,
+    DraftRankings,
+    simulate_drafts,
+)
+from ..league.batch_lineup import best_ball_totals
+from ..player_index import (
+    MISSING_PLAYER_ID,
+    PlayerIndex,
+    gsis_to_player_id,
+    is_hashed_player_id,
+)
+from . import nfl_data_cache
+from .create_ranking import (
+    RANKING_CACHE_DIR,
+    SUBMISSION_POSITION_LIMITS,
+    ranking_pipeline,
+)
+
+DEFAULT_SEASONS = tuple(range(2015, 2023))
+DEFAULT_LEAGUE_SIZE = 9
+ADP_WAREHOUSE_DIR = Path("cache") / "adp_warehouse"
+
+
+@dataclass
+class SeasonBacktest:
+    """How a season's ranking did against what happened."""
+
+    season: int
+    seconds: float
+    ranked_players: int = 0
+    rank_correlation: float = float("nan")
+    ranking_points: float = float("nan")
+    adp_points: float = float("nan")
+    average_finish: float = float("nan")
+    win_rate: float = float("nan")
+    error: Optional[str] = None
+
+
+def actual_weekly_points(
+    season: int, player_index: PlayerIndex, offline: bool = True
+) -> pd.DataFrame:
+    """Get regular season ppr points with shape (player id x week).
+
+    Players are matched by gsis id. Names are only a fallback, for rows without
+    a gsis id and for players the index only knows by name, like rookies missing
+    from last season's depth charts. By default the weekly data must already be
+    in the nfl cache.
+    """
+    weekly = nfl_data_cache.import_weekly_data(
+        [season],
+        columns=["player_id", "player_display_name", "week", "fantasy_points_ppr"],
+        row_filter=ds.field("season_type") == "REG",
+        offline=offline,
+    )
+    gsis_ids = weekly["player_id"].map(gsis_to_player_id)
+    name_ids = player_index.player_ids(weekly["player_display_name"])
+    by_name = (gsis_ids == MISSING_PLAYER_ID) | (
+        ~gsis_ids.isin(player_index.registered_ids())
+        & name_ids.map(is_hashed_player_id)
+    )
+    weekly["player_id"] = gsis_ids.where(~by_name, name_ids)
+
+    return weekly.pivot_table(
+        index="player_id",
+        columns="week",
+        values="fantasy_points_ppr",
+        aggfunc="sum",
+        fill_value=0.0,
+    )
+
+
+def backtest_draft_rankings(
+    ranking: pd.DataFrame, adp: pd.DataFrame, league_size: int
+) -> DraftRankings:
+    """Set up a league where team 0 drafts by the ranking and the rest by ADP."""
+    ranking = ranking.loc[ranking["position"].isin(POSITIONS)]
+    adp = adp.loc[adp["position"].isin(POSITIONS)]
+
+    players = (
+        pd.concat([ranking[["player_id", "position"]], adp[["player_id", "position"]]])
+        .drop_duplicates(subset="player_id")
+        .reset_index(drop=True)
+    )
+    players["position_code"] = players["position"].map(POSITIONS.index)
+    players["name"] = players["player_id"].astype(str)
+    players["team_name"] = None
+    player_indices = pd.Series(players.index, index=players["player_id"])
+
+    ranking_ids = player_indices[ranking["player_id"]].to_numpy()
+    adp_ids = player_indices[adp["player_id"]].to_numpy()
+    rankings = np.full((league_size, max(len(ranking_ids), len(adp_ids))), -1)
+    rankings[0, : len(ranking_ids)] = ranking_ids
+    rankings[1:, : len(adp_ids)] = adp_ids
+
+    return DraftRankings(
+        team_names=["ranking"] + [f"adp_{team}" for team in range(1, league_size)],
+        players=players,
+        rankings=rankings,
+    )
+
+
+def every_slot_draft_orders(league_size: int) -> np.ndarray:
+    """Return draft orders putting team 0 in each slot, with shape (slot x slot)."""
+    return np.array(
+        [np.insert(np.arange(1, league_size), slot, 0) for slot in range(league_size)]
+    )
+
+
+def player_points(
+    players: pd.DataFrame, weekly_points: pd.DataFrame
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack weekly points and position masks by draft player id.
+
+    Returns (player x week) points and (player x position) masks with an extra
+    last row for the -1 of empty picks, which scores 0 and fills no position.
+    """
+    points = np.zeros((len(players) + 1, weekly_points.shape[1]))
+    points[:-1] = weekly_points.reindex(players["player_id"], fill_value=0)
+    eligible = np.zeros((len(players) + 1, len(POSITIONS)), dtype=bool)
+    eligible[np.arange(len(players)), players["position_code"]] = True
+
+    return points, eligible
+
+
+def drafted_totals(
+    picks: np.ndarray, points: np.ndarray, eligible: np.ndarray
+) -> np.ndarray:
+    """Total each drafted roster's best ball points over the season.
+
+    ``picks`` has shape (draft x team x round) and the totals (draft x team).
+    """
+    return best_ball_totals(
+        np.moveaxis(points[picks], -1, -2), eligible[picks][..., None, :, :]
+    ).sum(axis=-1)
+
+
+def backtest_season(
+    season: int,
+    league_size: int = DEFAULT_LEAGUE_SIZE,
+    position_limits: Dict[str, int] = SUBMISSION_POSITION_LIMITS,
+    roster_limits: Dict[str, int] = POSITION_LIMITS,
+    ranking_factors: Sequence[str] = ("adp_position_rank", "depth_position_rank"),
+    cache_dir: Path = RANKING_CACHE_DIR,
+    adp_warehouse: Path = ADP_WAREHOUSE_DIR,
+    offline: bool = True,
+) -> SeasonBacktest:
+    """Build a season's ranking, draft with it and score the drafted rosters.
+
+    The ranking is built with ``position_limits``, whose order lays out the
+    overall ranking like the submitted one, and drafts are capped at
+    ``roster_limits`` per position. Team 0 drafts by the ranking from every
+    draft slot while the other teams draft by ADP, and each roster's best ball
+    points are totalled over the season's actual weekly points, without
+    streaming. Unless ``offline`` is off,
+    nfl data must already be cached. Errors are reported instead of raised.
+    """
+    start = time.perf_counter()
+    report = SeasonBacktest(season=season, seconds=0.0)
+    try:
+        pipeline = ranking_pipeline(
+            league_size,
+            position_limits,
+            ranking_factors,
+            cache_dir,
+            season=season,
+            adp_warehouse=adp_warehouse,
+            offline=offline,
+        )
+        ranking = pipeline.run("reduced")
+        adp = pipeline.run("adp_data")
+        weekly_points = actual_weekly_points(
+            season, pipeline.run("player_index"), offline
+        )
+
+        season_points = weekly_points.sum(axis=1)
+        ranking = ranking.assign(
+            points=season_points.reindex(ranking["player_id"], fill_value=0).to_numpy()
+        )
+        report.ranked_players = len(ranking)
+        report.rank_correlation = float(
+            ranking.groupby("position")
+            .apply(
+                lambda position: position["position_rank"]
+                .rank()
+                .corr(position["points"].rank(ascending=False))
+            )
+            .mean()
+        )
+
+        draft_rankings = backtest_draft_rankings(ranking, adp, league_size)
+        draft_orders = every_slot_draft_orders(league_size)
+        picks = simulate_drafts(
+            draft_rankings, draft_orders, DEFAULT_ROUNDS, roster_limits
+        )
+
+        totals = drafted_totals(
+            picks, *player_points(draft_rankings.players, weekly_points)
+        )
+        finish = 1 + (totals > totals[:, :1]).sum(axis=1)
+
+        report.ranking_points = float(totals[:, 0].mean())
+        report.adp_points = float(totals[:, 1:].mean())
+        report.average_finish = float(finish.mean())
+        report.win_rate = float((finish == 1).mean())
+    except Exception as error:
+        report.error = f"{type(error).__name__}: {error}"
+
+    report.seconds = time.perf_counter() - start
+
+    return report
+
+
+def backtest_seasons(
+    seasons: Sequence[int] = DEFAULT_SEASONS,
+    league_size: int = DEFAULT_LEAGUE_SIZE,
+    position_limits: Dict[str, int] = SUBMISSION_POSITION_LIMITS,
+    roster_limits: Dict[str, int] = POSITION_LIMITS,
+    ranking_factors: Sequence[str] = ("adp_position_rank", "depth_position_rank"),
+    cache_dir: Path = RANKING_CACHE_DIR,
+    adp_warehouse: Path = ADP_WAREHOUSE_DIR,
+    max_workers: Optional[int] = None,
+    offline: bool = True,
+) -> pd.DataFrame:
+    """Backtest every season in its own process and return a row per season."""
+    args = [
+        (
+            season,
+            league_size,
+            position_limits,
+            roster_limits,
+            ranking_factors,
+            cache_dir,
+            adp_warehouse,
+            offline,
+        )
+        for season in seasons
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers or len(args) or 1) as executor:
+        reports = list(executor.map(backtest_season, *zip(*args)))
+
+    return pd.DataFrame([asdict(report) for report in reports])
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Backtest past seasons from cached data and write the metrics."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("seasons", nargs="*", type=int, default=list(DEFAULT_SEASONS))
+    parser.add_argument("--league-size", type=int, default=DEFAULT_LEAGUE_SIZE)
+    parser.add_argument("--adp-warehouse", type=Path, default=ADP_WAREHOUSE_DIR)
+    parser.add_argument("--report", type=Path, default=Path("backtest.csv"))
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument(
+        "--download", action="store_true", help="download nfl data missing from cache"
+    )
+    args = parser.parse_args(argv)
+
+    report = backtest_seasons(
+        args.seasons,
+        league_size=args.league_size,
+        adp_warehouse=args.adp_warehouse,
+        max_workers=args.max_workers,
+        offline=not args.download,
+    )
+    report.to_csv(args.report, index=False)
+    print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
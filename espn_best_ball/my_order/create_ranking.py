@@ -1,113 +1,236 @@
 """Create a draft order ranking."""
 
-from io import StringIO
-from typing import Sequence
+import argparse
+from pathlib import Path
+from typing import Optional, Sequence
 
-import nfl_data_py as nfl
+import numpy as np
 import pandas as pd
+import pyarrow.dataset as ds
 
+from .. import player_index as player_index_module
+from ..pipeline import Pipeline, Stage, file_fingerprint
+from ..player_index import PlayerIndex, canonical_name, gsis_to_player_id
+from . import _adp_api, depth_charts, nfl_data_cache, ranking_engine
+from . import adp_warehouse as adp_warehouse_module
 from ._adp_api import ADPRestApi
-
-
-def main():
+from .adp_warehouse import load_adp
+from .depth_charts import DEPTH_CHART_FILE, DEPTH_CHART_FOLDER, read_depth_charts
+from .ranking_engine import overall_ranks, position_ranks, weighted_scores
+
+ADP_CACHE_DIR = Path("cache") / "adp"
+RANKING_CACHE_DIR = Path("cache") / "ranking"
+# Bump to rerun every stage, e.g. after upgrading pandas or nfl_data_py
+RANKING_PIPELINE_VERSION = "1"
+# Stages that fetch from the network
+NETWORK_STAGES = (
+    "depth_chart_data",
+    "fantasy_points",
+    "current_depth_charts",
+    "adp_data",
+)
+SUBMISSION_POSITION_LIMITS = {"RB": 5, "WR": 5, "QB": 2, "TE": 2}
+
+
+def main(argv: Optional[Sequence[str]] = None):
     """Run an example script."""
-    # Previous year depth chart performance
-    depth_chart_data = _get_depth_chart_data()
-    fantasy_points = _get_fantasy_points()
-    depth_with_points = _add_fantasy_points_to_depth_chart(
-        depth_chart_data, fantasy_points
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--refresh",
+        nargs="*",
+        metavar="STAGE",
+        help="stages to run again, without names the ones fetching from the network",
     )
-    depth_chart_performance = _create_depth_chart_performance(depth_with_points)
-
-    # Merge to current depth charts
-    current_depth_charts = _get_current_depth_charts()
-    depth_chart_perf_curr = _merge_current_depth_chart_to_depth_chart_performance(
-        current_depth_charts, depth_chart_performance
+    args = parser.parse_args(argv)
+
+    write_submission(Path("mason_g.csv"), league_size=9, refresh=args.refresh)
+
+
+def write_submission(
+    output: Path,
+    league_size: int,
+    ranking_factors: Sequence[str] = ("adp_position_rank", "depth_position_rank"),
+    season: int = 2022,
+    adp_warehouse: Optional[Path] = None,
+    refresh: Optional[Sequence[str]] = None,
+):
+    """Run the ranking pipeline, print its stage timings and write the csv.
+
+    ``refresh`` takes the stages of a --refresh option, see ``refresh_stages``.
+    """
+    pipeline = ranking_pipeline(
+        league_size=league_size,
+        position_limits=SUBMISSION_POSITION_LIMITS,
+        ranking_factors=ranking_factors,
+        season=season,
+        adp_warehouse=adp_warehouse,
     )
+    submission = pipeline.run("submission", refresh=refresh_stages(refresh))
+    for timing in pipeline.timings:
+        status = "cached" if timing.cached else "ran"
+        print(f"{timing.name:<30} {status:<6} {timing.seconds:8.3f}s")
+
+    # Write out
+    submission.to_csv(output, index=False)
 
-    # Add adp
-    adp_data = _get_adp_data()
-    depth_chart_perf_w_adp_curr = _merge_adp_data_and_depth_chart_performance_data(
-        adp_data, depth_chart_perf_curr
-    )
 
-    # Create position ranking
-    depth_chart_perf_w_adp_curr["position_rank"] = _create_position_ranking(
-        position_col=depth_chart_perf_w_adp_curr["position"],
-        ranking_factors=[
-            depth_chart_perf_w_adp_curr["adp_position_rank"],
-            depth_chart_perf_w_adp_curr["depth_position_rank"],
+def refresh_stages(names: Optional[Sequence[str]]) -> Sequence[str]:
+    """Return the stages a --refresh option names, the network stages if none."""
+    if names is None:
+        return ()
+
+    return names or NETWORK_STAGES
+
+
+def ranking_pipeline(
+    league_size: int,
+    position_limits: dict,
+    ranking_factors: Sequence[str] = ("adp_position_rank", "depth_position_rank"),
+    cache_dir: Path = RANKING_CACHE_DIR,
+    season: int = 2022,
+    adp_warehouse: Optional[Path] = None,
+    offline: bool = False,
+) -> Pipeline:
+    """Declare the ranking stages, ending with the "submission" stage.
+
+    The ranking is for ``season`` from the previous season's depth charts and
+    points. ADP comes from the ADP warehouse when given, and otherwise from the
+    API. With ``offline`` nfl data only comes from the local cache.
+    """
+    return Pipeline(
+        [
+            # Previous year depth chart performance
+            Stage(
+                "depth_chart_data",
+                _get_depth_chart_data,
+                params={"year": season - 1, "offline": offline},
+                helpers=(nfl_data_cache,),
+                refresh_param="refresh",
+            ),
+            Stage(
+                "fantasy_points",
+                _get_fantasy_points,
+                params={"year": season - 1, "offline": offline},
+                helpers=(nfl_data_cache,),
+                refresh_param="refresh",
+            ),
+            Stage(
+                "depth_with_points",
+                _add_fantasy_points_to_depth_chart,
+                inputs=("depth_chart_data", "fantasy_points"),
+            ),
+            Stage(
+                "depth_chart_performance",
+                _create_depth_chart_performance,
+                inputs=("depth_with_points",),
+            ),
+            # Merge to current depth charts
+            Stage(
+                "current_depth_charts",
+                _get_current_depth_charts,
+                params={"season": season, "offline": offline},
+                helpers=(_get_depth_chart_data, depth_charts, nfl_data_cache),
+                fingerprint=_depth_chart_fingerprint,
+                refresh_param="refresh",
+            ),
+            Stage(
+                "player_index",
+                _create_player_index,
+                inputs=("depth_chart_data", "current_depth_charts"),
+                helpers=(player_index_module,),
+            ),
+            Stage(
+                "depth_chart_perf_curr",
+                _merge_current_depth_chart_to_depth_chart_performance,
+                inputs=(
+                    "current_depth_charts",
+                    "depth_chart_performance",
+                    "player_index",
+                ),
+                helpers=(player_index_module,),
+            ),
+            # Add adp
+            Stage(
+                "adp_data",
+                _get_adp_data,
+                inputs=("player_index",),
+                params={"year": season, "adp_warehouse": adp_warehouse},
+                helpers=(player_index_module, _adp_api, adp_warehouse_module),
+                fingerprint=_adp_warehouse_fingerprint,
+            ),
+            Stage(
+                "depth_chart_perf_w_adp_curr",
+                _merge_adp_data_and_depth_chart_performance_data,
+                inputs=("adp_data", "depth_chart_perf_curr"),
+            ),
+            # Create position ranking
+            Stage(
+                "position_ranking",
+                _add_position_ranking,
+                inputs=("depth_chart_perf_w_adp_curr",),
+                params={"ranking_factors": list(ranking_factors)},
+                helpers=(_create_position_ranking, ranking_engine),
+            ),
+            # Reduce data to make my life easier
+            Stage(
+                "reduced",
+                _reduce_data,
+                inputs=("position_ranking",),
+                params={"league_size": league_size, "position_limits": position_limits},
+                helpers=(ranking_engine,),
+            ),
+            # Clean up data to match submission requirements
+            Stage("submission", _final_cleanup, inputs=("reduced",)),
         ],
+        cache_dir,
+        version=RANKING_PIPELINE_VERSION,
     )
 
-    # Reduce data to make my life easier
-    depth_chart_perf_w_adp_curr = _reduce_data(
-        depth_chart_perf_w_adp_curr,
-        league_size=9,
-        position_limits={"RB": 5, "WR": 5, "QB": 2, "TE": 2},
+
+def _depth_chart_fingerprint(season: int = 2022, offline: bool = False) -> str:
+    """Hash the season's depth chart csv, so editing it reruns its stage."""
+    return file_fingerprint(DEPTH_CHART_FOLDER / DEPTH_CHART_FILE.format(season=season))
+
+
+def _adp_warehouse_fingerprint(
+    year: int = 2022, adp_warehouse: Optional[Path] = None
+) -> str:
+    """Hash the ADP warehouse's files, so ingesting new ADP reruns its stage."""
+    if adp_warehouse is None:
+        return ""
+
+    return file_fingerprint(
+        *sorted(file for file in Path(adp_warehouse).rglob("*") if file.is_file())
     )
 
-    # Clean up data to match submission requirements
-    submission = _final_cleanup(depth_chart_perf_w_adp_curr)
 
-    # Write out
-    submission.to_csv("mason_g.csv", index=False)
-
-
-TEAM_TO_TEAM_CODE = {
-    "Arizona Cardinals": "ARI",
-    "Atlanta Falcons": "ATL",
-    "Baltimore Ravens": "BAL",
-    "Buffalo Bills": "BUF",
-    "Carolina Panthers": "CAR",
-    "Chicago Bears": "CHI",
-    "Cincinnati Bengals": "CIN",
-    "Cleveland Browns": "CLE",
-    "Dallas Cowboys": "DAL",
-    "Denver Broncos": "DEN",
-    "Detroit Lions": "DET",
-    "Green Bay Packers": "GB",
-    "Houston Texans": "HOU",
-    "Indianapolis Colts": "IND",
-    "Jacksonville Jaguars": "JAX",
-    "Kansas City Chiefs": "KC",
-    "Los Angeles Chargers": "LAC",
-    "Los Angeles Rams": "LA",
-    "Las Vegas Raiders": "LV",
-    "Miami Dolphins": "MIA",
-    "Minnesota Vikings": "MIN",
-    "New England Patriots": "NE",
-    "New Orleans Saints": "NO",
-    "New York Giants": "NYG",
-    "New York Jets": "NYJ",
-    "Philadelphia Eagles": "PHI",
-    "Pittsburgh Steelers": "PIT",
-    "Seattle Seahawks": "SEA",
-    "San Francisco 49ers": "SF",
-    "Tampa Bay Buccaneers": "TB",
-    "Tennessee Titans": "TEN",
-    "Washington Commanders": "WAS",
-}
-
-
-def _get_depth_chart_data() -> pd.DataFrame:
+def _get_depth_chart_data(
+    year: int = 2021, refresh: bool = False, offline: bool = False
+) -> pd.DataFrame:
     """Get the depth chart data."""
-    depth_chart_2021 = nfl.import_depth_charts([2021])
-    depth_chart_2021 = depth_chart_2021.loc[depth_chart_2021["week"] == 1]
-    depth_chart_2021 = depth_chart_2021.loc[
-        depth_chart_2021["depth_position"].isin(["QB", "TE", "RB", "WR"])
-    ]
-    depth_chart_2021 = depth_chart_2021[
-        ["gsis_id", "club_code", "depth_position", "depth_team"]
-    ]
+    depth_chart_2021 = nfl_data_cache.import_depth_charts(
+        [year],
+        columns=["gsis_id", "full_name", "club_code", "depth_position", "depth_team"],
+        row_filter=(ds.field("week") == 1)
+        & ds.field("depth_position").isin(["QB", "TE", "RB", "WR"]),
+        categories=["club_code", "depth_position"],
+        refresh=refresh,
+        offline=offline,
+    )
 
     return depth_chart_2021
 
 
-def _get_fantasy_points() -> pd.DataFrame:
+def _get_fantasy_points(
+    year: int = 2021, refresh: bool = False, offline: bool = False
+) -> pd.DataFrame:
     """Get fantasy points."""
-    fantasy_points_2021 = nfl.import_seasonal_data([2021])
-    fantasy_points_2021 = fantasy_points_2021[["player_id", "fantasy_points_ppr"]]
+    fantasy_points_2021 = nfl_data_cache.import_seasonal_data(
+        [year],
+        columns=["player_id", "fantasy_points_ppr"],
+        refresh=refresh,
+        offline=offline,
+    )
 
     return fantasy_points_2021
 
@@ -136,62 +259,65 @@ def _create_depth_chart_performance(depth_chart: pd.DataFrame) -> pd.DataFrame:
         "depth_team"
     ].astype(int)
     depth_chart_performance["depth_team"] += depth_chart_performance.groupby(
-        ["club_code", "depth_position", "depth_team"]
+        ["club_code", "depth_position", "depth_team"], observed=True
     ).cumcount()
 
     return depth_chart_performance
 
 
-def _get_current_depth_charts() -> pd.DataFrame:
-    """Get current depth charts."""
-    with open("espn_best_ball/my_order/data/2022_depth_charts.csv") as f:
-        df = f.read()
-
-    corrected_file = ""
-    teams = df.split('\n""\n')
-    for team in teams:
-        team_name = team.split("\n")[0]
-        team_data = f"\n{team_name}," + f"\n{team_name},".join(team.split("\n")[1:])
-        corrected_file += team_data
-
-    df = pd.read_csv(
-        StringIO(corrected_file),
-        names=[
-            "team",
-            "qb_rank",
-            "qb",
-            "rb_rank",
-            "rb",
-            "wr_rank",
-            "wr",
-            "te_rank",
-            "te",
-        ],
-    )
-    df["depth"] = df["team"] == df["team"].shift()
-    df["depth"] = df.groupby("team")["depth"].cumsum()
-
-    df["team"] = df["team"].map(TEAM_TO_TEAM_CODE)
-
-    stacked_df = pd.DataFrame()
-    columns = ["qb", "rb", "wr", "te"]
-    for col in columns:
-        position_df = df[["team", col, "depth"]].copy()
-        position_df["position"] = col.upper()
-        position_df = position_df.rename({col: "name"}, axis=1)
+def _get_current_depth_charts(
+    season: int = 2022, refresh: bool = False, offline: bool = False
+) -> pd.DataFrame:
+    """Get current depth charts.
 
-        stacked_df = pd.concat([stacked_df, position_df])
+    Seasons without a depth chart csv use nfl_data_py's week 1 depth charts.
+    """
+    if (DEPTH_CHART_FOLDER / DEPTH_CHART_FILE.format(season=season)).exists():
+        return read_depth_charts([season]).drop(columns="season")
 
-    stacked_df = stacked_df.dropna()
-    stacked_df["depth"] = stacked_df["depth"].astype(str)
+    depth_chart = _get_depth_chart_data(season, refresh, offline).sort_values(
+        by="depth_team", kind="stable"
+    )
+    current_depth_chart = pd.DataFrame(
+        {
+            "team": depth_chart["club_code"].astype(str),
+            "name": depth_chart["full_name"],
+            "position": depth_chart["depth_position"].astype(str),
+        }
+    ).drop_duplicates(subset=["team", "name"])
+    current_depth_chart["depth"] = (
+        current_depth_chart.groupby(["team", "position"]).cumcount() + 1
+    ).astype(str)
+
+    return current_depth_chart[["team", "name", "depth", "position"]]
+
+
+def _create_player_index(
+    depth_chart_data: pd.DataFrame, current_depth_chart: pd.DataFrame
+) -> PlayerIndex:
+    """Create a player index of last year's and the current depth charts."""
+    player_index = PlayerIndex()
+    player_index.add_many(
+        depth_chart_data["full_name"],
+        depth_chart_data["gsis_id"].map(gsis_to_player_id),
+    )
+    player_index.add_many(current_depth_chart["name"])
 
-    return stacked_df
+    return player_index
 
 
 def _merge_current_depth_chart_to_depth_chart_performance(
-    current_depth_chart: pd.DataFrame, depth_chart_performance: pd.DataFrame
+    current_depth_chart: pd.DataFrame,
+    depth_chart_performance: pd.DataFrame,
+    player_index: PlayerIndex,
 ) -> pd.DataFrame:
     """Merge current depth chart to depth chart performance."""
+    prior_points = pd.Series(
+        depth_chart_performance["fantasy_points_ppr"].to_numpy(),
+        index=depth_chart_performance["gsis_id"].map(gsis_to_player_id),
+    ).dropna()
+    prior_points = prior_points.loc[~prior_points.index.duplicated()]
+
     depth_chart_performance["depth_team"] = depth_chart_performance[
         "depth_team"
     ].astype(str)
@@ -210,14 +336,11 @@ def _merge_current_depth_chart_to_depth_chart_performance(
     depth_chart_performance = depth_chart_performance.loc[
         ~depth_chart_performance[["name", "team"]].duplicated()
     ]
-    depth_chart_performance["name"] = (
+    depth_chart_performance["player_id"] = player_index.player_ids(
         depth_chart_performance["name"]
-        .str.replace(r"\s", "_", regex=True)
-        .str.replace(r"\W", "", regex=True)
-        .str.lower()
-        .str.split("_")
-        .str[0:2]
-        .str.join("_")
+    )
+    depth_chart_performance["name"] = depth_chart_performance["name"].map(
+        canonical_name, na_action="ignore"
     )
     depth_chart_performance["player_first_name"] = (
         depth_chart_performance["name"].str.split("_").str[0]
@@ -229,37 +352,50 @@ def _merge_current_depth_chart_to_depth_chart_performance(
     depth_chart_performance["depth_position_rank"] = (
         depth_chart_performance.groupby(["position"]).cumcount() + 1
     )
+    # The player's own points last season, not those of their depth chart slot
+    depth_chart_performance["prior_points_position_rank"] = (
+        depth_chart_performance["player_id"]
+        .map(prior_points)
+        .groupby(depth_chart_performance["position"])
+        .rank(ascending=False, method="first")
+    )
 
     return depth_chart_performance
 
 
-def _get_adp_data() -> pd.DataFrame:
+def _get_adp_data(
+    player_index: PlayerIndex, year: int = 2022, adp_warehouse: Optional[Path] = None
+) -> pd.DataFrame:
     """Get adp data."""
-    adp_data = ADPRestApi(
-        scoring_format="ppr", year=2022, number_of_teams=12, position="ALL"
-    ).get()
-    adp_df = pd.DataFrame(adp_data)
-
-    adp_data_standard = ADPRestApi(
-        scoring_format="standard", year=2022, number_of_teams=12, position="ALL"
-    ).get()
-    adp_df_standard = pd.DataFrame(adp_data_standard)
-
+    if adp_warehouse is None:
+        adp_data, adp_data_standard = ADPRestApi.get_many(
+            [("ppr", year, 12, "ALL"), ("standard", year, 12, "ALL")],
+            cache_dir=ADP_CACHE_DIR,
+        )
+        adp_df = pd.DataFrame(adp_data)
+        adp_df_standard = pd.DataFrame(adp_data_standard)
+    else:
+        adp = load_adp(
+            adp_warehouse,
+            columns=["scoring_format", "name", "position", "adp"],
+            scoring_formats=["ppr", "standard"],
+            years=[year],
+            team_counts=[12],
+        )
+        adp_df = adp.loc[adp["scoring_format"] == "ppr"].copy()
+        adp_df_standard = adp.loc[adp["scoring_format"] == "standard"].copy()
+
+    adp_df["player_id"] = player_index.player_ids(adp_df["name"], fuzzy=True)
+    adp_df_standard["player_id"] = player_index.player_ids(
+        adp_df_standard["name"], fuzzy=True
+    )
     adp_df_standard = adp_df_standard.loc[
-        ~adp_df_standard["name"].isin(adp_df["name"].unique())
+        ~adp_df_standard["player_id"].isin(adp_df["player_id"].unique())
     ]
     adp_df = pd.concat([adp_df, adp_df_standard])
 
-    adp_df = adp_df[["name", "position", "adp"]].copy()
-    adp_df["name"] = (
-        adp_df["name"]
-        .str.replace(r"\s", "_", regex=True)
-        .str.replace(r"\W", "", regex=True)
-        .str.lower()
-        .str.split("_")
-        .str[0:2]
-        .str.join("_")
-    )
+    adp_df = adp_df[["player_id", "name", "position", "adp"]].copy()
+    adp_df["name"] = adp_df["name"].map(canonical_name)
     adp_df = adp_df.sort_values(by="adp", ascending=True)
     adp_df["adp_position_rank"] = adp_df.groupby("position").cumcount() + 1
 
@@ -270,32 +406,57 @@ def _merge_adp_data_and_depth_chart_performance_data(
     adp_data: pd.DataFrame, depth_chart_performance: pd.DataFrame
 ) -> pd.DataFrame:
     """Merge adp_data and depth_chart performance data."""
-    depth_with_adp = depth_chart_performance.merge(adp_data, on=["name", "position"])
+    depth_with_adp = depth_chart_performance.merge(
+        adp_data.drop(columns="name"), on=["player_id", "position"]
+    )
 
     return depth_with_adp
 
 
+def _add_position_ranking(
+    data: pd.DataFrame, ranking_factors: Sequence[str]
+) -> pd.DataFrame:
+    """Add a position_rank column averaging the ranking factor columns."""
+    data = data.copy()
+    data["position_rank"] = _create_position_ranking(
+        position_col=data["position"],
+        ranking_factors=[data[factor] for factor in ranking_factors],
+    )
+
+    return data
+
+
 def _create_position_ranking(
     position_col: pd.Series, ranking_factors: Sequence[pd.Series]
 ) -> pd.Series:
     """Create position rankings from provided ranking factors."""
-    position_rank_average = pd.DataFrame(ranking_factors).mean(axis=1)
-    position_rank_average = position_rank_average.sort_values()
+    position_codes, positions = pd.factorize(position_col)
+    factors = np.column_stack(
+        [factor.to_numpy(dtype=float) for factor in ranking_factors]
+    )
+    scores = weighted_scores(factors, np.ones((1, len(ranking_factors))))
 
-    return position_rank_average.groupby(position_col).cumcount() + 1
+    return pd.Series(
+        position_ranks(scores, position_codes, len(positions))[0],
+        index=position_col.index,
+    )
 
 
 def _reduce_data(
     data: pd.DataFrame, position_limits: dict, league_size: int
 ) -> pd.DataFrame:
     """Reduce data to make my life easier."""
-    submission = pd.DataFrame()
-
-    for position, limit in position_limits.items():
-        x = data.loc[data["position"] == position]
-        submission = pd.concat([submission, x.iloc[: (limit * league_size)]])
-
-    return submission
+    data = data.loc[data["position"].isin(position_limits)]
+    position_codes = data["position"].map(list(position_limits).index).to_numpy()
+    overall = overall_ranks(
+        data["position_rank"].to_numpy()[None, :],
+        position_codes,
+        np.array([league_size]),
+        np.array([list(position_limits.values())]),
+    )[0, 0]
+
+    kept = np.flatnonzero(overall)
+    return data.iloc[kept[np.argsort(overall[kept])]].copy()
 
 
 def _final_cleanup(submission: pd.DataFrame) -> pd.DataFrame:
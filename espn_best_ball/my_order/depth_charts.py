@@ -0,0 +1,93 @@
+"""Read depth chart csvs."""
+
+import csv
+from pathlib import Path
+from typing import Iterable, Iterator, Tuple
+
+import pandas as pd
+
+DEPTH_CHART_FOLDER = Path(__file__).parent / "data"
+DEPTH_CHART_FILE = "{season}_depth_charts.csv"
+POSITIONS = ("QB", "RB", "WR", "TE")
+
+TEAM_TO_TEAM_CODE = {
+    "Arizona Cardinals": "ARI",
+    "Atlanta Falcons": "ATL",
+    "Baltimore Ravens": "BAL",
+    "Buffalo Bills": "BUF",
+    "Carolina Panthers": "CAR",
+    "Chicago Bears": "CHI",
+    "Cincinnati Bengals": "CIN",
+    "Cleveland Browns": "CLE",
+    "Dallas Cowboys": "DAL",
+    "Denver Broncos": "DEN",
+    "Detroit Lions": "DET",
+    "Green Bay Packers": "GB",
+    "Houston Texans": "HOU",
+    "Indianapolis Colts": "IND",
+    "Jacksonville Jaguars": "JAX",
+    "Kansas City Chiefs": "KC",
+    "Los Angeles Chargers": "LAC",
+    "Los Angeles Rams": "LA",
+    "Las Vegas Raiders": "LV",
+    "Miami Dolphins": "MIA",
+    "Minnesota Vikings": "MIN",
+    "New England Patriots": "NE",
+    "New Orleans Saints": "NO",
+    "New York Giants": "NYG",
+    "New York Jets": "NYJ",
+    "Philadelphia Eagles": "PHI",
+    "Pittsburgh Steelers": "PIT",
+    "Seattle Seahawks": "SEA",
+    "San Francisco 49ers": "SF",
+    "Tampa Bay Buccaneers": "TB",
+    "Tennessee Titans": "TEN",
+    "Washington Commanders": "WAS",
+}
+
+
+def iter_depth_chart_records(
+    lines: Iterable[str],
+) -> Iterator[Tuple[str, str, int, str]]:
+    """Yield the team code, position, depth and name of each depth chart entry.
+
+    The csv holds a block per team: the team name, a header row, then one row
+    per depth with an ECR and name column for each position, and blocks are
+    separated by a blank quoted line. Empty names and unknown teams are skipped.
+    """
+    team = None
+    depth = 0
+    for row in csv.reader(lines):
+        if len(row) == 1:
+            team = TEAM_TO_TEAM_CODE.get(row[0]) if row[0] else None
+            depth = -1
+            continue
+
+        depth += 1
+        if team is None or depth == 0:
+            continue
+
+        for position, name in zip(POSITIONS, row[1::2]):
+            if name:
+                yield team, position, depth, name
+
+
+def read_depth_charts(
+    seasons: Iterable[int], folder: Path = DEPTH_CHART_FOLDER
+) -> pd.DataFrame:
+    """Read each season's depth chart csv into one long frame.
+
+    Returns a row per entry with team, name, depth and position, like the merge
+    keys of last year's depth charts, plus the season.
+    """
+    columns = {"season": [], "team": [], "name": [], "depth": [], "position": []}
+    for season in seasons:
+        with open(folder / DEPTH_CHART_FILE.format(season=season), newline="") as f:
+            for team, position, depth, name in iter_depth_chart_records(f):
+                columns["season"].append(season)
+                columns["team"].append(team)
+                columns["name"].append(name)
+                columns["depth"].append(str(depth))
+                columns["position"].append(position)
+
+    return pd.DataFrame(columns)
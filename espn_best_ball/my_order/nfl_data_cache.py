@@ -0,0 +1,172 @@
+"""Local columnar cache for nfl_data_py imports."""
+
+import os
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Sequence, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+from pyarrow import fs
+
+from ..instrumentation import span
+
+NFL_CACHE_DIR = Path("cache") / "nfl"
+
+
+def import_depth_charts(
+    years: Iterable[int],
+    columns: Optional[Sequence[str]] = None,
+    row_filter: Optional[ds.Expression] = None,
+    categories: Optional[Sequence[str]] = None,
+    cache_dir: Union[str, Path] = NFL_CACHE_DIR,
+    refresh: bool = False,
+    offline: bool = False,
+) -> pd.DataFrame:
+    """Load depth charts through the local cache, see load_cached_nfl_data."""
+    return load_cached_nfl_data(
+        "depth_charts",
+        _nfl_importer("import_depth_charts"),
+        years,
+        columns=columns,
+        row_filter=row_filter,
+        categories=categories,
+        cache_dir=cache_dir,
+        refresh=refresh,
+        offline=offline,
+    )
+
+
+def import_seasonal_data(
+    years: Iterable[int],
+    columns: Optional[Sequence[str]] = None,
+    row_filter: Optional[ds.Expression] = None,
+    categories: Optional[Sequence[str]] = None,
+    cache_dir: Union[str, Path] = NFL_CACHE_DIR,
+    refresh: bool = False,
+    offline: bool = False,
+) -> pd.DataFrame:
+    """Load seasonal data through the local cache, see load_cached_nfl_data."""
+    return load_cached_nfl_data(
+        "seasonal_data",
+        _nfl_importer("import_seasonal_data"),
+        years,
+        columns=columns,
+        row_filter=row_filter,
+        categories=categories,
+        cache_dir=cache_dir,
+        refresh=refresh,
+        offline=offline,
+    )
+
+
+def import_weekly_data(
+    years: Iterable[int],
+    columns: Optional[Sequence[str]] = None,
+    row_filter: Optional[ds.Expression] = None,
+    categories: Optional[Sequence[str]] = None,
+    cache_dir: Union[str, Path] = NFL_CACHE_DIR,
+    refresh: bool = False,
+    offline: bool = False,
+) -> pd.DataFrame:
+    """Load weekly data through the local cache, see load_cached_nfl_data."""
+    return load_cached_nfl_data(
+        "weekly_data",
+        _nfl_importer("import_weekly_data"),
+        years,
+        columns=columns,
+        row_filter=row_filter,
+        categories=categories,
+        cache_dir=cache_dir,
+        refresh=refresh,
+        offline=offline,
+    )
+
+
+def _nfl_importer(name: str) -> Callable[[List[int]], pd.DataFrame]:
+    """Return an nfl_data_py import function, loading nfl_data_py on first call.
+
+    Reads served from the cache never import nfl_data_py.
+    """
+
+    def importer(years: List[int]) -> pd.DataFrame:
+        import nfl_data_py
+
+        return getattr(nfl_data_py, name)(years)
+
+    return importer
+
+
+def load_cached_nfl_data(
+    dataset_name: str,
+    importer: Callable[[List[int]], pd.DataFrame],
+    years: Iterable[int],
+    columns: Optional[Sequence[str]] = None,
+    row_filter: Optional[ds.Expression] = None,
+    categories: Optional[Sequence[str]] = None,
+    cache_dir: Union[str, Path] = NFL_CACHE_DIR,
+    refresh: bool = False,
+    offline: bool = False,
+) -> pd.DataFrame:
+    """Load an nfl_data_py dataset, downloading only the years not cached yet.
+
+    Each year is kept as an uncompressed Arrow IPC (Feather) file that is memory
+    mapped on load. Only ``columns`` are read, rows not matching ``row_filter`` are
+    dropped before converting to pandas, and ``categories`` are returned as
+    categorical columns. With ``offline`` nothing is downloaded and a year
+    missing from the cache raises FileNotFoundError.
+    """
+    if offline and refresh:
+        raise ValueError("Cannot refresh nfl data offline")
+
+    files = [
+        _cached_year(dataset_name, importer, year, Path(cache_dir), refresh, offline)
+        for year in years
+    ]
+    with span(f"nfl_cache.load_{dataset_name}") as load_span:
+        dataset = ds.dataset(
+            [str(file) for file in files],
+            format="feather",
+            filesystem=fs.LocalFileSystem(use_mmap=True),
+        )
+        table = dataset.to_table(
+            columns=list(columns) if columns is not None else None, filter=row_filter
+        )
+        load_span.add(rows=table.num_rows, bytes=table.nbytes)
+
+        return table.to_pandas(
+            categories=list(categories) if categories is not None else None
+        )
+
+
+def _cached_year(
+    dataset_name: str,
+    importer: Callable[[List[int]], pd.DataFrame],
+    year: int,
+    cache_dir: Path,
+    refresh: bool,
+    offline: bool = False,
+) -> Path:
+    """Return the cache file for a year, importing it first if needed."""
+    file = cache_dir / dataset_name / f"{year}.arrow"
+    if offline and not file.exists():
+        raise FileNotFoundError(
+            f"{dataset_name} for {year} is not cached in {cache_dir} and offline"
+        )
+
+    if refresh or not file.exists():
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = file.with_suffix(f".{os.getpid()}.tmp")
+        with span(f"nfl.import_{dataset_name}") as import_span:
+            data = importer([year])
+            import_span.add(rows=len(data))
+
+        feather.write_feather(
+            pa.Table.from_pandas(data, preserve_index=False),
+            tmp_file,
+            compression="uncompressed",
+        )
+        tmp_file.replace(file)
+
+    return file
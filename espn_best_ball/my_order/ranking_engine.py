@@ -0,0 +1,119 @@
+"""Rank players for many ranking configurations at once."""
+
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+SUBMISSION_COLUMNS = [
+    "player_first_name",
+    "player_last_name",
+    "team_name",
+    "position",
+    "overall_rank",
+    "position_rank",
+]
+
+
+def weighted_scores(factors: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Average the factor columns with each weight vector, skipping NaN factors.
+
+    ``factors`` has shape (player x factor) and ``weights`` (weights x factor).
+    Returns scores with shape (weights x player), NaN where a player has no
+    factors.
+    """
+    present = ~np.isnan(factors)
+    weighted_sum = np.where(present, factors, 0) @ weights.T
+    weight_total = present @ weights.T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (weighted_sum / weight_total).T
+
+
+def position_ranks(
+    scores: np.ndarray, position_codes: np.ndarray, n_positions: int
+) -> np.ndarray:
+    """Rank players within their position by ascending score, starting at 1.
+
+    ``scores`` has shape (weights x player). Ties keep the player order and
+    players without a score rank last.
+    """
+    codes = np.broadcast_to(position_codes, scores.shape)
+    order = np.lexsort((scores, codes), axis=-1)
+    counts = np.bincount(position_codes, minlength=n_positions)
+    starts = np.cumsum(counts) - counts
+
+    sorted_ranks = np.arange(scores.shape[1]) - starts[position_codes[order]] + 1
+    ranks = np.empty_like(sorted_ranks)
+    np.put_along_axis(ranks, order, sorted_ranks, axis=-1)
+
+    return ranks
+
+
+def overall_ranks(
+    ranks: np.ndarray,
+    position_codes: np.ndarray,
+    league_sizes: np.ndarray,
+    position_limits: np.ndarray,
+) -> np.ndarray:
+    """Keep each position's top players for each league and rank them overall.
+
+    ``ranks`` are position ranks with shape (weights x player) and
+    ``position_limits`` has shape (league x position) with positions in
+    submission order. A position keeps limit * league size players, and the
+    overall rank runs through the kept players position by position. Returns
+    shape (weights x league x player), with 0 for players that are not kept.
+    """
+    counts = np.bincount(position_codes, minlength=position_limits.shape[1])
+    kept = np.minimum(position_limits * np.asarray(league_sizes)[:, None], counts)
+    offsets = np.cumsum(kept, axis=1) - kept
+
+    ranks = ranks[:, None, :]
+    is_kept = ranks <= kept[None, :, position_codes]
+
+    return np.where(is_kept, offsets[None, :, position_codes] + ranks, 0)
+
+
+def rank_submissions(
+    data: pd.DataFrame,
+    factor_columns: Sequence[str],
+    weights: np.ndarray,
+    league_sizes: Sequence[int],
+    position_limits: Sequence[Dict[str, int]],
+) -> pd.DataFrame:
+    """Create the submission for every weight vector and league at once.
+
+    Each pair of a league size and its position limits is a league, and every
+    weight vector is ranked for every league. Positions are submitted in the
+    order of the first league's limits, and positions without a limit are
+    dropped. Returns the submission columns plus ``weights`` and ``league``
+    indices, sorted by weights, league and overall rank.
+    """
+    positions = list(
+        dict.fromkeys(position for limits in position_limits for position in limits)
+    )
+    data = data.loc[data["position"].isin(positions)]
+    position_codes = data["position"].map(positions.index).to_numpy()
+    limits = np.array(
+        [
+            [limits.get(position, 0) for position in positions]
+            for limits in position_limits
+        ]
+    )
+
+    factors = data[list(factor_columns)].to_numpy(dtype=float)
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    ranks = position_ranks(
+        weighted_scores(factors, weights), position_codes, len(positions)
+    )
+    overall = overall_ranks(ranks, position_codes, np.asarray(league_sizes), limits)
+
+    weight_index, league_index, player = np.nonzero(overall)
+    submissions = data.iloc[player][SUBMISSION_COLUMNS[:4]].reset_index(drop=True)
+    submissions["overall_rank"] = overall[weight_index, league_index, player]
+    submissions["position_rank"] = ranks[weight_index, player]
+    submissions.insert(0, "league", league_index)
+    submissions.insert(0, "weights", weight_index)
+
+    return submissions.sort_values(
+        by=["weights", "league", "overall_rank"], ignore_index=True
+    )
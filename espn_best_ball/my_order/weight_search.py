@@ -0,0 +1,383 @@
+"""Search ranking factor weights that draft the best backtested rosters."""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ..draft.draft_simulator import (
+    DEFAULT_ROUNDS,
+    POSITION_LIMITS,
+    DraftRankings,
+    simulate_drafts,
+)
+from ..pipeline import Pipeline
+from .backtest import (
+    ADP_WAREHOUSE_DIR,
+    DEFAULT_LEAGUE_SIZE,
+    actual_weekly_points,
+    backtest_draft_rankings,
+    drafted_totals,
+    every_slot_draft_orders,
+    player_points,
+)
+from .create_ranking import (
+    RANKING_CACHE_DIR,
+    SUBMISSION_POSITION_LIMITS,
+    ranking_pipeline,
+)
+from .ranking_engine import (
+    SUBMISSION_COLUMNS,
+    overall_ranks,
+    position_ranks,
+    rank_submissions,
+    weighted_scores,
+)
+
+DEFAULT_FACTORS = (
+    "adp_position_rank",
+    "depth_position_rank",
+    "prior_points_position_rank",
+)
+DEFAULT_SEARCH_SEASONS = (2019, 2020, 2021)
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_GENERATIONS = 20
+DEFAULT_PATIENCE = 3
+ELITE_FRACTION = 0.25
+
+_SEARCH_SEASONS: List["SearchSeason"] = []
+
+
+@dataclass
+class SearchSeason:
+    """A season's ranking inputs and actual points packed as draft player ids."""
+
+    season: int
+    factors: np.ndarray
+    position_codes: np.ndarray
+    draft_ids: np.ndarray
+    draft_rankings: DraftRankings
+    points: np.ndarray
+    eligible: np.ndarray
+
+
+@dataclass
+class WeightSearchResult:
+    """The best weights found and how the search got there."""
+
+    factor_columns: List[str]
+    weights: np.ndarray
+    points: float
+    history: pd.DataFrame
+
+
+def ranking_data(
+    pipeline: Pipeline, position_limits: Dict[str, int] = SUBMISSION_POSITION_LIMITS
+) -> pd.DataFrame:
+    """Get the ranking pipeline's players with every ranking factor, unranked."""
+    data = pipeline.run("depth_chart_perf_w_adp_curr")
+
+    return data.loc[data["position"].isin(position_limits)].reset_index(drop=True)
+
+
+def load_search_season(
+    season: int,
+    factor_columns: Sequence[str] = DEFAULT_FACTORS,
+    league_size: int = DEFAULT_LEAGUE_SIZE,
+    position_limits: Dict[str, int] = SUBMISSION_POSITION_LIMITS,
+    cache_dir: Path = RANKING_CACHE_DIR,
+    adp_warehouse: Optional[Path] = ADP_WAREHOUSE_DIR,
+    offline: bool = True,
+) -> SearchSeason:
+    """Pack a past season's factors, ADP board and actual points for the search."""
+    pipeline = ranking_pipeline(
+        league_size,
+        position_limits,
+        cache_dir=cache_dir,
+        season=season,
+        adp_warehouse=adp_warehouse,
+        offline=offline,
+    )
+    data = ranking_data(pipeline, position_limits)
+    adp = pipeline.run("adp_data")
+    weekly_points = actual_weekly_points(season, pipeline.run("player_index"), offline)
+
+    draft_rankings = backtest_draft_rankings(data, adp, league_size)
+    players = draft_rankings.players
+    draft_ids = pd.Series(players.index, index=players["player_id"])
+    points, eligible = player_points(players, weekly_points)
+
+    return SearchSeason(
+        season=season,
+        factors=data[list(factor_columns)].to_numpy(dtype=float),
+        position_codes=data["position"].map(list(position_limits).index).to_numpy(),
+        draft_ids=draft_ids[data["player_id"]].to_numpy(),
+        draft_rankings=draft_rankings,
+        points=points,
+        eligible=eligible,
+    )
+
+
+def weight_rankings(
+    season: SearchSeason,
+    weights: np.ndarray,
+    league_size: int = DEFAULT_LEAGUE_SIZE,
+    position_limits: Dict[str, int] = SUBMISSION_POSITION_LIMITS,
+) -> np.ndarray:
+    """Return the draft player ids each weighting submits, in overall order.
+
+    Returns shape (weights x player), padded with -1 after the kept players.
+    """
+    ranks = position_ranks(
+        weighted_scores(season.factors, weights),
+        season.position_codes,
+        len(position_limits),
+    )
+    overall = overall_ranks(
+        ranks,
+        season.position_codes,
+        np.array([league_size]),
+        np.array([list(position_limits.values())]),
+    )[:, 0]
+
+    order = np.argsort(np.where(overall > 0, overall, np.iinfo(overall.dtype).max))
+    return np.where(
+        np.take_along_axis(overall, order, axis=1) > 0, season.draft_ids[order], -1
+    )
+
+
+def score_weights(
+    season: SearchSeason,
+    weights: np.ndarray,
+    league_size: int = DEFAULT_LEAGUE_SIZE,
+    position_limits: Dict[str, int] = SUBMISSION_POSITION_LIMITS,
+    roster_limits: Dict[str, int] = POSITION_LIMITS,
+    rounds: int = DEFAULT_ROUNDS,
+) -> np.ndarray:
+    """Score every weighting by its average backtested best ball points.
+
+    Every weighting ranks with ``position_limits``, in the submitted order, and
+    drafts from every slot against ADP teams in one batch of simulated drafts
+    capped at ``roster_limits``. Returns the mean season total of its rosters
+    per weighting.
+    """
+    n_weights = len(weights)
+    candidates = weight_rankings(season, weights, league_size, position_limits)
+    adp_ranking = season.draft_rankings.rankings[1]
+    width = max(candidates.shape[1], len(adp_ranking))
+
+    rankings = np.full((n_weights, league_size, width), -1)
+    rankings[:, 1:, : len(adp_ranking)] = adp_ranking
+    rankings[:, 0, : candidates.shape[1]] = candidates
+    rankings = np.repeat(rankings, league_size, axis=0)
+    draft_orders = np.tile(every_slot_draft_orders(league_size), (n_weights, 1))
+
+    picks = simulate_drafts(
+        season.draft_rankings,
+        draft_orders,
+        rounds,
+        roster_limits,
+        rankings=rankings,
+    )
+    totals = drafted_totals(picks, season.points, season.eligible)
+
+    return totals[:, 0].reshape(n_weights, league_size).mean(axis=1)
+
+
+def _set_search_seasons(seasons: List[SearchSeason]):
+    """Keep the seasons in a worker process so batches only send weights."""
+    global _SEARCH_SEASONS
+    _SEARCH_SEASONS = seasons
+
+
+def _score_batch(
+    weights: np.ndarray,
+    league_size: int,
+    position_limits: Dict[str, int],
+    roster_limits: Dict[str, int],
+    rounds: int,
+) -> np.ndarray:
+    """Score a batch of weightings averaged over the worker's seasons."""
+    return np.mean(
+        [
+            score_weights(
+                season, weights, league_size, position_limits, roster_limits, rounds
+            )
+            for season in _SEARCH_SEASONS
+        ],
+        axis=0,
+    )
+
+
+def search_weights(
+    seasons: List[SearchSeason],
+    factor_columns: Sequence[str] = DEFAULT_FACTORS,
+    league_size: int = DEFAULT_LEAGUE_SIZE,
+    position_limits: Dict[str, int] = SUBMISSION_POSITION_LIMITS,
+    roster_limits: Dict[str, int] = POSITION_LIMITS,
+    rounds: int = DEFAULT_ROUNDS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_generations: int = DEFAULT_MAX_GENERATIONS,
+    patience: int = DEFAULT_PATIENCE,
+    tolerance: float = 0.0,
+    seed: Optional[int] = None,
+    max_workers: Optional[int] = None,
+) -> WeightSearchResult:
+    """Search factor weights with the cross-entropy method.
+
+    Each generation samples a batch of weightings on the simplex from a
+    Dirichlet around the best quarter of the last batch, and narrows it every
+    generation. The first batch includes equal weights and every batch keeps
+    the best weighting so far. The search stops after ``patience`` generations
+    without improving on the best points by more than ``tolerance``.
+    """
+    rng = np.random.default_rng(seed)
+    n_factors = len(factor_columns)
+    n_elite = max(1, int(batch_size * ELITE_FRACTION))
+
+    executor = None
+    if max_workers == 1:
+        _set_search_seasons(seasons)
+    else:
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_set_search_seasons,
+            initargs=(seasons,),
+        )
+    n_tasks = max_workers or os.cpu_count() or 1
+
+    best_weights = np.full(n_factors, 1 / n_factors)
+    best_points = -np.inf
+    concentration = float(n_factors)
+    mean = best_weights
+    history = []
+    stale = 0
+    try:
+        for generation in range(max_generations):
+            weights = np.vstack(
+                [best_weights, rng.dirichlet(mean * concentration, batch_size - 1)]
+            )
+            batches = np.array_split(weights, min(n_tasks, batch_size))
+            args = [
+                (batch, league_size, position_limits, roster_limits, rounds)
+                for batch in batches
+            ]
+            if executor is None:
+                points = np.concatenate([_score_batch(*batch) for batch in args])
+            else:
+                points = np.concatenate(list(executor.map(_score_batch, *zip(*args))))
+
+            elite = np.argsort(-points, kind="stable")[:n_elite]
+            history.append(
+                {
+                    "generation": generation,
+                    "best_points": points[elite[0]],
+                    "mean_points": points.mean(),
+                    **dict(zip(factor_columns, weights[elite[0]])),
+                }
+            )
+
+            if points[elite[0]] > best_points + tolerance:
+                stale = 0
+            else:
+                stale += 1
+            if points[elite[0]] > best_points:
+                best_points = points[elite[0]]
+                best_weights = weights[elite[0]]
+            if stale >= patience:
+                break
+
+            mean = weights[elite].mean(axis=0)
+            concentration *= 2
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    return WeightSearchResult(
+        factor_columns=list(factor_columns),
+        weights=best_weights,
+        points=float(best_points),
+        history=pd.DataFrame(history),
+    )
+
+
+def weighted_submission(
+    data: pd.DataFrame,
+    factor_columns: Sequence[str],
+    weights: np.ndarray,
+    league_size: int = DEFAULT_LEAGUE_SIZE,
+    position_limits: Dict[str, int] = SUBMISSION_POSITION_LIMITS,
+) -> pd.DataFrame:
+    """Rank with one weighting and return the submission columns."""
+    submission = rank_submissions(
+        data, factor_columns, weights, [league_size], [position_limits]
+    )
+
+    return submission[SUBMISSION_COLUMNS]
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    """Search weights on past seasons and write the best ranking's submission."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--seasons", nargs="+", type=int, default=list(DEFAULT_SEARCH_SEASONS)
+    )
+    parser.add_argument("--season", type=int, default=2022, help="season to submit")
+    parser.add_argument("--factors", nargs="+", default=list(DEFAULT_FACTORS))
+    parser.add_argument("--league-size", type=int, default=DEFAULT_LEAGUE_SIZE)
+    parser.add_argument("--adp-warehouse", type=Path, default=ADP_WAREHOUSE_DIR)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-generations", type=int, default=DEFAULT_MAX_GENERATIONS)
+    parser.add_argument("--patience", type=int, default=DEFAULT_PATIENCE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--max-workers", type=int, default=None)
+    parser.add_argument(
+        "--download", action="store_true", help="download nfl data missing from cache"
+    )
+    parser.add_argument("--output", type=Path, default=Path("mason_g.csv"))
+    args = parser.parse_args(argv)
+
+    seasons = [
+        load_search_season(
+            season,
+            args.factors,
+            args.league_size,
+            adp_warehouse=args.adp_warehouse,
+            offline=not args.download,
+        )
+        for season in args.seasons
+    ]
+    result = search_weights(
+        seasons,
+        args.factors,
+        args.league_size,
+        batch_size=args.batch_size,
+        max_generations=args.max_generations,
+        patience=args.patience,
+        seed=args.seed,
+        max_workers=args.max_workers,
+    )
+    print(result.history.to_string(index=False))
+    for factor, weight in zip(result.factor_columns, result.weights):
+        print(f"{factor:<30} {weight:.3f}")
+
+    # The submitted season's ADP comes from the API, like create_ranking
+    pipeline = ranking_pipeline(
+        args.league_size, SUBMISSION_POSITION_LIMITS, season=args.season
+    )
+    submission = weighted_submission(
+        ranking_data(pipeline),
+        result.factor_columns,
+        result.weights,
+        args.league_size,
+    )
+    submission.to_csv(args.output, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Memoized pipeline of stages."""
+
+import hashlib
+import inspect
+import os
+import pickle
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .instrumentation import span
+
+PIPELINE_CACHE_DIR = Path("cache") / "pipeline"
+
+
+@dataclass
+class Stage:
+    """A named function of upstream stage results and fixed parameters.
+
+    ``helpers`` are functions, classes or modules the stage calls whose source is
+    part of its key, and ``fingerprint`` is called with the parameters to hash anything
+    else the stage reads, like files. A stage with a ``refresh_param`` gets it
+    set to True when it is refreshed, so it can bypass its own caches.
+    """
+
+    name: str
+    function: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    params: Dict[str, Any] = field(default_factory=dict)
+    helpers: Tuple[Any, ...] = ()
+    fingerprint: Optional[Callable[..., str]] = None
+    refresh_param: Optional[str] = None
+
+
+@dataclass
+class StageTiming:
+    """How long a stage took and whether it came from the cache."""
+
+    name: str
+    seconds: float
+    cached: bool
+
+
+def file_fingerprint(*files: Union[str, Path]) -> str:
+    """Hash the bytes of files, with missing files hashing as missing."""
+    digest = hashlib.sha1()
+    for file in files:
+        try:
+            digest.update(Path(file).read_bytes())
+        except FileNotFoundError:
+            digest.update(b"missing")
+        digest.update(b"\0")
+
+    return digest.hexdigest()
+
+
+def _source(obj: Any) -> str:
+    """Return the source of a function, class or module, or its name without one."""
+    try:
+        return inspect.getsource(obj)
+    except (OSError, TypeError):
+        return getattr(obj, "__qualname__", obj.__name__)
+
+
+class Pipeline:
+    """A DAG of stages with results cached on disk by content.
+
+    A stage's key hashes its name, the source code of its function and helpers,
+    parameters, input fingerprint, the pipeline's ``version`` and the digests of
+    its inputs' results, and results are stored by the digest of their pickled
+    bytes. Bump ``version`` for changes the keys cannot see, like a new version
+    of a library. Running a stage only loads or executes what is needed: a stage
+    whose key has a stored result is not run, and neither are its upstream
+    stages unless something else needs their results. A stored result that has
+    been deleted is made again.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage],
+        cache_dir: Union[str, Path] = PIPELINE_CACHE_DIR,
+        version: str = "",
+    ):
+        """Initialize a new Pipeline instance."""
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = Path(cache_dir)
+        self.version = version
+        self.timings: List[StageTiming] = []
+        self._digests: Dict[str, str] = {}
+        self._results: Dict[str, Any] = {}
+        self._ref_files: Dict[str, Path] = {}
+        self._refresh: Set[str] = set()
+
+        for stage in stages:
+            for name in stage.inputs:
+                if name not in self.stages:
+                    raise ValueError(f"{stage.name} depends on unknown stage {name}")
+
+    def run(self, target: str, refresh: Iterable[str] = ()) -> Any:
+        """Return the result of a stage, running only invalidated stages.
+
+        Stages named in ``refresh`` run again even with a stored result, e.g. to
+        pick up new data from the network. Their downstream stages only run
+        again if the new result differs.
+        """
+        self.timings = []
+        self._digests = {}
+        self._results = {}
+        self._ref_files = {}
+        self._refresh = set(refresh)
+
+        return self._result(target, ())
+
+    def _result(self, name: str, path: Tuple[str, ...]) -> Any:
+        """Return the result of a stage, loading it from the cache if needed."""
+        digest = self._digest(name, path)
+        if name not in self._results:
+            start = time.perf_counter()
+            try:
+                with span(f"stage.{name}", cached=1):
+                    with open(self._object_file(digest), "rb") as f:
+                        self._results[name] = pickle.load(f)
+            except FileNotFoundError:
+                # The result was deleted from the cache, so make it again
+                self._execute(name, path)
+            else:
+                self.timings.append(
+                    StageTiming(name, time.perf_counter() - start, cached=True)
+                )
+
+        return self._results[name]
+
+    def _digest(self, name: str, path: Tuple[str, ...]) -> str:
+        """Return the digest of a stage's result, running the stage if needed."""
+        if name in self._digests:
+            return self._digests[name]
+        if name in path:
+            raise ValueError(f"Stages form a cycle: {' -> '.join(path + (name,))}")
+
+        path = path + (name,)
+        stage = self.stages[name]
+        key = self._key(
+            stage, [self._digest(upstream, path) for upstream in stage.inputs]
+        )
+        ref_file = self.cache_dir / "stages" / f"{name}_{key}"
+        self._ref_files[name] = ref_file
+        if ref_file.exists() and name not in self._refresh:
+            self._digests[name] = ref_file.read_text()
+            return self._digests[name]
+
+        return self._execute(name, path)
+
+    def _execute(self, name: str, path: Tuple[str, ...]) -> str:
+        """Run a stage whose key is known and store its result."""
+        stage = self.stages[name]
+        params = dict(stage.params)
+        if stage.refresh_param is not None and name in self._refresh:
+            params[stage.refresh_param] = True
+
+        inputs = [self._result(upstream, path) for upstream in stage.inputs]
+        start = time.perf_counter()
+        with span(f"stage.{name}", cached=0):
+            result = stage.function(*inputs, **params)
+        self.timings.append(
+            StageTiming(name, time.perf_counter() - start, cached=False)
+        )
+
+        data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        digest = hashlib.sha1(data).hexdigest()
+        self._write(self._object_file(digest), data)
+        self._write(self._ref_files[name], digest.encode())
+
+        self._digests[name] = digest
+        self._results[name] = result
+
+        return digest
+
+    def _key(self, stage: Stage, input_digests: List[str]) -> str:
+        """Hash a stage's definition, fingerprint and the digests of its inputs."""
+        definition = repr(
+            (
+                stage.name,
+                [_source(obj) for obj in (stage.function,) + stage.helpers],
+                sorted(stage.params.items()),
+                stage.fingerprint(**stage.params) if stage.fingerprint else None,
+                self.version,
+            )
+        )
+        return hashlib.sha1(
+            "\n".join([definition] + input_digests).encode()
+        ).hexdigest()
+
+    def _object_file(self, digest: str) -> Path:
+        """Return the file holding a pickled result."""
+        return self.cache_dir / "objects" / f"{digest}.pkl"
+
+    def _write(self, file: Path, data: bytes):
+        """Write a file atomically."""
+        file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_bytes(data)
+        tmp_file.replace(file)
@@ -0,0 +1,206 @@
+"""Player identity index."""
+
+import hashlib
+import re
+import warnings
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+
+NAME_ALIASES = {"gabe_davis": "gabriel_davis"}
+MISSING_PLAYER_ID = -1
+DEFAULT_MIN_SIMILARITY = 0.6
+NGRAM_SIZE = 3
+
+# Hashed ids start above every gsis id so the two can never collide.
+_HASHED_ID_OFFSET = 1 << 40
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_NON_WORD_PATTERN = re.compile(r"\W")
+
+
+class AmbiguousPlayerWarning(UserWarning):
+    """A name was looked up that belongs to more than one player."""
+
+
+@lru_cache(maxsize=None)
+def _name_tokens(name: str) -> Tuple[str, ...]:
+    """Split a name into lower case word tokens, dropping punctuation."""
+    name = _WHITESPACE_PATTERN.sub("_", name.strip())
+    return tuple(_NON_WORD_PATTERN.sub("", name).lower().split("_"))
+
+
+@lru_cache(maxsize=None)
+def canonical_name(name: str) -> str:
+    """Return the lower case first_last form of a player name."""
+    name = "_".join(_name_tokens(name)[0:2])
+    return NAME_ALIASES.get(name, name)
+
+
+def canonical_first_token(name: str) -> str:
+    """Return the first lower case token of a name, e.g. of a first name."""
+    return _name_tokens(name)[0]
+
+
+def gsis_to_player_id(gsis_id: str) -> int:
+    """Convert an nfl gsis id like 00-0033873 to an integer player id."""
+    if not isinstance(gsis_id, str):
+        return MISSING_PLAYER_ID
+    return int(gsis_id.replace("-", ""))
+
+
+@lru_cache(maxsize=None)
+def hashed_player_id(name: str) -> int:
+    """Return a stable integer player id for a canonical name."""
+    digest = hashlib.blake2b(name.encode(), digest_size=5).digest()
+    return _HASHED_ID_OFFSET + int.from_bytes(digest, "big")
+
+
+def is_hashed_player_id(player_id: int) -> bool:
+    """Return whether an id was hashed from a name rather than a gsis id."""
+    return player_id >= _HASHED_ID_OFFSET
+
+
+def _ngrams(name: str) -> Set[str]:
+    """Return the character n-grams of a padded name."""
+    padded = f"^{name}$"
+    return {padded[i : i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+class PlayerIndex:
+    """Map player names and their aliases to stable integer ids.
+
+    Names are canonicalized to first_last. Registered names keep the id they
+    were added with, e.g. from a gsis id, and any other name gets an id hashed
+    from its canonical form until a real id is added. A name added with two
+    different real ids, like two players named Mike Williams, is ambiguous:
+    ``ambiguous`` keeps every id and looking the name up warns and returns its
+    hashed id rather than guessing. A character n-gram index over registered
+    names backs the fuzzy lookups.
+    """
+
+    def __init__(self):
+        """Initialize a new PlayerIndex instance."""
+        self.ids: Dict[str, int] = {}
+        self.ambiguous: Dict[str, List[int]] = {}
+        self.ngrams: Dict[str, Set[str]] = defaultdict(set)
+
+    def add(self, name: str, player_id: Optional[int] = None) -> int:
+        """Register a name, returning its id.
+
+        Without a player_id the name keeps any id it already has, or its hashed
+        id when it is ambiguous. A player_id replaces a hashed id the name was
+        given before it arrived.
+        """
+        canonical = canonical_name(name)
+        for ngram in _ngrams(canonical):
+            self.ngrams[ngram].add(canonical)
+
+        if player_id is None or player_id == MISSING_PLAYER_ID:
+            if canonical in self.ambiguous:
+                return hashed_player_id(canonical)
+            return self.ids.setdefault(canonical, hashed_player_id(canonical))
+
+        if canonical in self.ambiguous:
+            if player_id not in self.ambiguous[canonical]:
+                self.ambiguous[canonical].append(player_id)
+        else:
+            known_id = self.ids.get(canonical, player_id)
+            if known_id == player_id or is_hashed_player_id(known_id):
+                self.ids[canonical] = player_id
+            else:
+                self.ambiguous[canonical] = [self.ids.pop(canonical), player_id]
+
+        return player_id
+
+    def registered_ids(self) -> Set[int]:
+        """Return every id added to the index, including ambiguous names' ids."""
+        return {
+            *self.ids.values(),
+            *(player_id for ids in self.ambiguous.values() for player_id in ids),
+        }
+
+    def add_many(
+        self, names: pd.Series, player_ids: Optional[Iterable[int]] = None
+    ) -> pd.Series:
+        """Register many names, returning their ids aligned to names."""
+        if player_ids is None:
+            player_ids = [None] * len(names)
+
+        return pd.Series(
+            [
+                (
+                    self.add(name, player_id)
+                    if isinstance(name, str)
+                    else MISSING_PLAYER_ID
+                )
+                for name, player_id in zip(names, player_ids)
+            ],
+            index=names.index,
+            dtype="int64",
+        )
+
+    def player_id(
+        self,
+        name: str,
+        fuzzy: bool = False,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+    ) -> int:
+        """Look up the id for a name.
+
+        Names that are not registered fall back to the closest registered name
+        when ``fuzzy`` is on, and otherwise to their hashed id. Ambiguous names
+        warn and get their hashed id.
+        """
+        if not isinstance(name, str):
+            return MISSING_PLAYER_ID
+
+        canonical = canonical_name(name)
+        if fuzzy and canonical not in self.ids and canonical not in self.ambiguous:
+            canonical = self.closest_name(canonical, min_similarity) or canonical
+
+        if canonical in self.ambiguous:
+            warnings.warn(
+                f"{canonical} matches several players: {self.ambiguous[canonical]}",
+                AmbiguousPlayerWarning,
+                stacklevel=2,
+            )
+
+        return self.ids.get(canonical, hashed_player_id(canonical))
+
+    def player_ids(
+        self,
+        names: pd.Series,
+        fuzzy: bool = False,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+    ) -> pd.Series:
+        """Look up the ids for many names, once per distinct name."""
+        distinct_names = names.drop_duplicates()
+        ids = pd.Series(
+            [self.player_id(name, fuzzy, min_similarity) for name in distinct_names],
+            index=distinct_names,
+            dtype="int64",
+        )
+
+        return names.map(ids).astype("int64")
+
+    def closest_name(
+        self, name: str, min_similarity: float = DEFAULT_MIN_SIMILARITY
+    ) -> Optional[str]:
+        """Return the registered name with the most similar n-grams, if any.
+
+        Similarity is the Jaccard index of the two names' n-gram sets.
+        """
+        ngrams = _ngrams(canonical_name(name))
+        shared = Counter(
+            candidate for ngram in ngrams for candidate in self.ngrams.get(ngram, ())
+        )
+
+        best_name, best_similarity = None, 0.0
+        for candidate, count in sorted(shared.items()):
+            similarity = count / (len(ngrams) + len(_ngrams(candidate)) - count)
+            if similarity >= min_similarity and similarity > best_similarity:
+                best_name, best_similarity = candidate, similarity
+
+        return best_name
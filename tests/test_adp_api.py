@@ -0,0 +1,170 @@
+"""Tests of the ADP API against a stub HTTP server."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+from espn_best_ball.my_order._adp_api import ADPRestApi
+
+LAST_MODIFIED = "Mon, 01 Aug 2022 00:00:00 GMT"
+
+
+class StubADPHandler(BaseHTTPRequestHandler):
+    """Answer ADP requests, honoring If-None-Match and If-Modified-Since."""
+
+    def do_GET(self):
+        """Return the server's ADP for the path and query."""
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with self.server.lock:
+            self.server.requests.append((url.path, query, dict(self.headers)))
+            version = self.server.version
+
+        etag = f'"{version}"'
+        not_modified = self.headers.get("If-None-Match") == etag or (
+            self.server.last_modified_only
+            and self.headers.get("If-Modified-Since") == LAST_MODIFIED
+        )
+        if not_modified:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = json.dumps(
+            {
+                "meta": {"total_drafts": 100, **query, "version": version},
+                "players": [
+                    {"name": "Good Player", "times_drafted": 90},
+                    {"name": "Bad Player", "times_drafted": 0},
+                ],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Last-Modified", LAST_MODIFIED)
+        if not self.server.last_modified_only:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep the test output quiet."""
+
+
+@pytest.fixture
+def server():
+    """Serve stub ADP on a free local port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubADPHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.version = 1
+    server.last_modified_only = False
+    server.api_url = f"http://127.0.0.1:{server.server_address[1]}/adp"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session():
+    """Use a session of the test's own."""
+    with requests.Session() as session:
+        yield session
+
+
+def test_get_removes_bad_data(server, session):
+    api = ADPRestApi("ppr", 2022, 12, "all", session=session, api_url=server.api_url)
+
+    assert api.get() == [{"name": "Good Player", "times_drafted": 90}]
+    path, query, _ = server.requests[0]
+    assert path == "/adp/ppr"
+    assert query == {"year": "2022", "teams": "12", "position": "all"}
+
+
+def test_etag_revalidation_reuses_cached_body(server, session, tmp_path):
+    api = ADPRestApi(cache_dir=tmp_path, session=session, api_url=server.api_url)
+
+    first = api.get_response()
+    second = api.get_response()
+
+    assert second == first
+    _, _, headers = server.requests[1]
+    assert headers["If-None-Match"] == '"1"'
+    assert headers["If-Modified-Since"] == LAST_MODIFIED
+    assert [path.name for path in tmp_path.iterdir()] == ["ppr_2022_12_all.json"]
+
+
+def test_last_modified_revalidation_reuses_cached_body(server, session, tmp_path):
+    server.last_modified_only = True
+    api = ADPRestApi(cache_dir=tmp_path, session=session, api_url=server.api_url)
+
+    first = api.get_response()
+    server.version = 2
+    second = api.get_response()
+
+    assert second == first
+    _, _, headers = server.requests[1]
+    assert "If-None-Match" not in headers
+    assert headers["If-Modified-Since"] == LAST_MODIFIED
+
+
+def test_changed_response_replaces_cache(server, session, tmp_path):
+    api = ADPRestApi(cache_dir=tmp_path, session=session, api_url=server.api_url)
+
+    api.get_response()
+    server.version = 2
+    changed = api.get_response()
+
+    assert changed["meta"]["version"] == 2
+    assert api.get_response() == changed
+    _, _, headers = server.requests[2]
+    assert headers["If-None-Match"] == '"2"'
+
+
+def test_get_many_keeps_configuration_order(server, session, tmp_path):
+    configurations = [
+        ("ppr", 2022, teams, position)
+        for teams in (8, 10, 12)
+        for position in ("all", "RB", "all")
+    ]
+
+    responses = ADPRestApi.get_many(
+        configurations,
+        max_workers=4,
+        remove_bad_data=False,
+        cache_dir=tmp_path,
+        session=session,
+        api_url=server.api_url,
+    )
+
+    assert [
+        (int(response["meta"]["teams"]), response["meta"]["position"])
+        for response in responses
+    ] == [(teams, position) for _, _, teams, position in configurations]
+    assert len(server.requests) == len(configurations)
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        f"ppr_2022_{teams}_{position}.json"
+        for teams in (8, 10, 12)
+        for position in ("all", "RB")
+    )
+
+
+def test_get_many_removes_bad_data(server, session):
+    results = ADPRestApi.get_many(
+        [("ppr", 2022, 12, "all"), ("half-ppr", 2021, 10, "qb")],
+        session=session,
+        api_url=server.api_url,
+    )
+
+    assert results == [[{"name": "Good Player", "times_drafted": 90}]] * 2
+    assert sorted(path for path, _, _ in server.requests) == [
+        "/adp/half-ppr",
+        "/adp/ppr",
+    ]